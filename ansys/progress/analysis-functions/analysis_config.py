@@ -22,6 +22,7 @@ STRUCTURAL_CONFIG = {
     'param_min_default': 100,
     'param_max_default': 1000,
     'param_steps_default': 10,
+    'batch_size': None,  # Sweep points per pool task (None = auto)
     'material_properties': {
         'youngs_modulus': {
             'name': "Young's Modulus",
@@ -52,6 +53,7 @@ THERMAL_CONFIG = {
     'param_min_default': 500,
     'param_max_default': 5000,
     'param_steps_default': 10,
+    'batch_size': None,  # Sweep points per pool task (None = auto)
     'material_properties': {
         'thermal_conductivity': {
             'name': 'Thermal Conductivity',
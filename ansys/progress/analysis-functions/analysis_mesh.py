@@ -0,0 +1,51 @@
+"""
+analysis_mesh.py - Bulk Mesh Transfer to MAPDL
+===============================================
+Formats a Gmsh tet mesh as NBLOCK/EBLOCK tables so the whole mesh reaches
+MAPDL in a single input_strings call
+"""
+
+import io
+import numpy as np
+
+
+def emit_cdb_block(node_tags, node_coords, tet_nodes):
+    """
+    Format nodes and linear tets as MAPDL NBLOCK/EBLOCK text
+
+    Elements use MAT/TYPE/REAL/SECNUM 1 and are numbered 1..Ne, the same as
+    issuing one N command per node and one E command per tet
+
+    Args:
+        node_tags: (Nn,) node numbers
+        node_coords: (Nn, 3) node coordinates
+        tet_nodes: (Ne, 4) node numbers of each tet
+
+    Returns:
+        text: NBLOCK and EBLOCK commands ready for mapdl.input_strings
+    """
+    n_nodes = len(node_tags)
+    n_elems = len(tet_nodes)
+    out = io.StringIO()
+
+    # NBLOCK rows: node number, solid model entity, line location, X, Y, Z
+    out.write(f"NBLOCK,6,SOLID,{int(node_tags.max())},{n_nodes}\n")
+    out.write("(3i9,6e21.13e3)\n")
+    zeros = np.zeros(n_nodes)
+    np.savetxt(out, np.column_stack([node_tags, zeros, zeros, node_coords]),
+               fmt="%9d%9d%9d%21.13E%21.13E%21.13E")
+    out.write("N,R5.3,LOC,       -1,\n")
+
+    # EBLOCK rows: MAT, TYPE, REAL, SECNUM, ESYS, birth/death, solid model
+    # reference, shape flag, node count, unused, element number, then nodes
+    out.write(f"EBLOCK,19,SOLID,{n_elems},{n_elems}\n")
+    out.write("(19i9)\n")
+    header = np.zeros((n_elems, 11), dtype=np.int64)
+    header[:, 0:4] = 1
+    header[:, 8] = tet_nodes.shape[1]
+    header[:, 10] = np.arange(1, n_elems + 1)
+    np.savetxt(out, np.column_stack([header, tet_nodes.astype(np.int64)]),
+               fmt="%9d", delimiter="")
+    out.write("       -1\n")
+
+    return out.getvalue()
@@ -0,0 +1,123 @@
+"""
+analysis_pool.py - Parametric Sweep Driver
+===========================================
+Runs the independent points of a parametric study either serially on one
+MAPDL instance or in parallel on a persistent pool of MAPDL instances
+"""
+
+import os
+import numpy as np
+import pandas as pd
+from ansys.mapdl.core import MapdlPool
+
+
+def launch_mapdl_pool(exec_file, n_instances):
+    """Launch a pool of MAPDL instances, splitting the CPU cores between them"""
+    nproc = max(1, (os.cpu_count() or 1) // n_instances)
+    print(f"Launching {n_instances} MAPDL instances ({nproc} core(s) each)...")
+    return MapdlPool(n_instances, exec_file=exec_file, nproc=nproc)
+
+
+def prepare_base_model(mapdl, db_name, build_model, *args):
+    """
+    Build the load-independent model once per instance, then resume it from its .db
+
+    Args:
+        mapdl: MAPDL instance
+        db_name: Name of the .db saved in the instance's working directory
+        build_model: Function called as build_model(mapdl, *args) when the
+                     instance has no saved base model yet
+    """
+    # Tracked on the instance itself, so a replacement from the pool
+    # always builds its own .db
+    if db_name in getattr(mapdl, '_base_dbs', ()):
+        mapdl.finish()
+        mapdl.clear()
+        mapdl.resume(db_name, 'db')
+        mapdl.prep7()
+        return
+
+    build_model(mapdl, *args)
+    mapdl.save(db_name, 'db')
+    if not hasattr(mapdl, '_base_dbs'):
+        mapdl._base_dbs = set()
+    mapdl._base_dbs.add(db_name)
+
+
+def forget_base_model(db_name, mapdl=None, pool=None):
+    """Make every instance rebuild its base model on the next prepare_base_model"""
+    for instance in (pool if pool is not None else [mapdl]):
+        getattr(instance, '_base_dbs', set()).discard(db_name)
+
+
+def run_sweep(solve_step, params, mapdl=None, pool=None, batch_size=None):
+    """
+    Solve every point of a parametric sweep
+
+    Args:
+        solve_step: Function called as solve_step(mapdl, run_number, value)
+        params: Parameter values; run numbers start at 1
+        mapdl: MAPDL instance used when no pool is given
+        pool: Optional MapdlPool; points are then solved in parallel and the
+              same instances are reused for the whole sweep
+        batch_size: Points handed to a pool worker per task (None = auto,
+                    about four batches per instance)
+
+    Returns:
+        results: solve_step return values, ordered by run number
+    """
+    steps = list(enumerate(params, 1))
+
+    if pool is None:
+        return [solve_step(mapdl, run_number, value) for run_number, value in steps]
+
+    if batch_size is None:
+        batch_size = max(1, len(steps) // (4 * len(pool)))
+    batches = [steps[i:i + batch_size] for i in range(0, len(steps), batch_size)]
+
+    # Pool workers finish out of order, so tag each result with its run number
+    def solve_batch(worker, batch):
+        return [(run_number, solve_step(worker, run_number, value))
+                for run_number, value in batch]
+
+    # Wrap each batch in a tuple: pool.map unpacks list items into arguments
+    batch_results = pool.map(solve_batch, [(batch,) for batch in batches],
+                             progress_bar=False)
+    results = [item for batch in batch_results for item in batch]
+    return [result for _, result in sorted(results, key=lambda item: item[0])]
+
+
+def results_frame(rows, numeric_columns, int_columns=()):
+    """
+    Assemble sweep result rows into a DataFrame with a fixed column layout
+
+    Args:
+        rows: Result dicts, one per sweep point
+        numeric_columns: Keys written into one preallocated float array
+                         (NaN where a failed run has no value)
+        int_columns: Numeric keys holding counters or node numbers, stored
+                     as nullable integers
+
+    Returns:
+        df: Numeric columns in the given order, followed by any other keys
+            (timestamp, error) as object columns
+    """
+    n_rows = len(rows)
+    col_index = {name: j for j, name in enumerate(numeric_columns)}
+    values = np.full((n_rows, len(numeric_columns)), np.nan)
+    other = {}
+
+    for i, row in enumerate(rows):
+        for key, value in row.items():
+            j = col_index.get(key)
+            if j is not None:
+                values[i, j] = value
+            else:
+                other.setdefault(key, np.full(n_rows, None, dtype=object))[i] = value
+
+    df = pd.DataFrame(values, columns=list(numeric_columns))
+    for name in int_columns:
+        df[name] = df[name].astype('Int64')
+    for key, column in other.items():
+        df[key] = column
+    return df
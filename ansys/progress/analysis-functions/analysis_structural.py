@@ -11,8 +11,11 @@ from pathlib import Path
 import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation
 from matplotlib import image as mpimg
+from functools import partial
 from PIL import Image
 from analysis_config import STRUCTURAL_CONFIG, register_analysis
+from analysis_pool import run_sweep, results_frame, prepare_base_model, forget_base_model
+from analysis_mesh import emit_cdb_block
 
 # ============================================================
 # VISUALIZATION FUNCTIONS
@@ -391,37 +394,43 @@ def create_structural_mesh_in_mapdl(mapdl, node_tags, node_coords, tet_nodes):
     mapdl.finish()
     mapdl.clear()
     mapdl.prep7()
-    mapdl.units("SI")
-    
-    # Define structural element type
-    mapdl.et(1, 285)  # SOLID285 - tetrahedral
-    
-    # Create nodes
-    for node_id, coords in zip(node_tags, node_coords):
-        mapdl.n(int(node_id), coords[0], coords[1], coords[2])
+    with mapdl.non_interactive:
+        mapdl.units("SI")
+        
+        # Define structural element type
+        mapdl.et(1, 285)  # SOLID285 - tetrahedral
     
-    # Create elements
-    for tet in tet_nodes:
-        mapdl.e(int(tet[0]), int(tet[1]), int(tet[2]), int(tet[3]))
+    # Nodes and elements go over as NBLOCK/EBLOCK tables in one call
+    mapdl.input_strings(emit_cdb_block(node_tags, node_coords, tet_nodes))
 
 # ============================================================
 # SINGLE ANALYSIS RUN
 # ============================================================
 
-def run_single_structural_analysis(mapdl, node_tags, node_coords, tet_nodes, material_props, force):
-    """Run single static structural analysis"""
-    
-    # Recreate mesh for each analysis
+# Saved per MAPDL instance once its mesh, material and supports are built
+STRUCTURAL_BASE_DB = 'structural_base'
+
+def build_structural_model(mapdl, node_tags, node_coords, tet_nodes, material_props):
+    """Build the load-independent model: mesh, material and supports"""
     create_structural_mesh_in_mapdl(mapdl, node_tags, node_coords, tet_nodes)
     
-    # Material properties
-    mapdl.mp("EX", 1, material_props['youngs_modulus'])
-    mapdl.mp("NUXY", 1, material_props['poissons_ratio'])
-    mapdl.mp("DENS", 1, material_props['density'])
+    with mapdl.non_interactive:
+        # Material properties
+        mapdl.mp("EX", 1, material_props['youngs_modulus'])
+        mapdl.mp("NUXY", 1, material_props['poissons_ratio'])
+        mapdl.mp("DENS", 1, material_props['density'])
+        
+        # Boundary conditions - Fixed at Z=0
+        mapdl.nsel("S", "LOC", "Z", 0)
+        mapdl.d("ALL", "ALL", 0)
+        mapdl.allsel()
+
+def run_single_structural_analysis(mapdl, node_tags, node_coords, tet_nodes, material_props, force):
+    """Run single static structural analysis"""
     
-    # Boundary conditions - Fixed at Z=0
-    mapdl.nsel("S", "LOC", "Z", 0)
-    mapdl.d("ALL", "ALL", 0)
+    # Mesh, material and supports are the same for every force value
+    prepare_base_model(mapdl, STRUCTURAL_BASE_DB, build_structural_model,
+                       node_tags, node_coords, tet_nodes, material_props)
     
     # Apply force at Z=0.05
     mapdl.allsel()
@@ -470,9 +479,91 @@ def run_single_structural_analysis(mapdl, node_tags, node_coords, tet_nodes, mat
 # PARAMETRIC STUDY
 # ============================================================
 
+def solve_structural_step(mapdl, run_number, force, node_tags, node_coords, tet_nodes,
+                          material, output_path, total_steps):
+    """Solve one force value and export its plots; returns (row, stress_img, disp_img)"""
+    print(f"\n[{run_number}/{total_steps}] Analyzing Force = {force:.1f} N...")
+    
+    stress_img = None
+    disp_img = None
+    
+    try:
+        results = run_single_structural_analysis(
+            mapdl, node_tags, node_coords, tet_nodes, material, force
+        )
+        
+        # Export contour plots for animation
+        print("  Exporting contour plots...")
+        
+        stress_img = export_stress_plot(mapdl, output_path, 
+                                       f'stress_step_{run_number:03d}.png', step_number=run_number)
+        
+        disp_img = export_displacement_plot(mapdl, output_path,
+                                           f'displacement_step_{run_number:03d}.png', step_number=run_number)
+        
+        # Export detailed visualizations for first and last steps
+        if run_number == 1 or run_number == total_steps:
+            step_label = "first" if run_number == 1 else "last"
+            print(f"  Exporting detailed {step_label} step visualizations...")
+            
+            # Stress components
+            export_stress_components(mapdl, output_path, f"stress_components_{step_label}")
+            
+            # Displacement components
+            export_displacement_components(mapdl, output_path, f"displacement_components_{step_label}")
+            
+            # Principal stresses
+            export_principal_stresses(mapdl, output_path, f"principal_stress_{step_label}")
+            
+            # Deformed shape
+            export_deformed_shape(mapdl, output_path, f"deformed_shape_{step_label}.png")
+        
+        row = {
+            'run_number': run_number,
+            'force_n': force,
+            'max_stress_mpa': results['max_stress_mpa'],
+            'max_stress_x_m': results['max_stress_x_m'],
+            'max_stress_y_m': results['max_stress_y_m'],
+            'max_stress_z_m': results['max_stress_z_m'],
+            'max_stress_node': results['max_stress_node'],
+            'max_displacement_mm': results['max_displacement_mm'],
+            'max_disp_x_m': results['max_disp_x_m'],
+            'max_disp_y_m': results['max_disp_y_m'],
+            'max_disp_z_m': results['max_disp_z_m'],
+            'max_disp_node': results['max_disp_node'],
+            'avg_stress_mpa': results['avg_stress_mpa'],
+            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        
+        print(f"  ✓ Max Stress: {results['max_stress_mpa']:.2f} MPa at node {results['max_stress_node']}")
+        print(f"  ✓ Max Displacement: {results['max_displacement_mm']:.4f} mm at node {results['max_disp_node']}")
+        
+    except Exception as e:
+        print(f"  ✗ Error: {e}")
+        row = {
+            'run_number': run_number,
+            'force_n': force,
+            'error': str(e),
+            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        }
+    
+    return row, stress_img, disp_img
+
+# Numeric columns of the results table, in output order
+STRUCTURAL_RESULT_COLUMNS = [
+    'run_number', 'force_n',
+    'max_stress_mpa', 'max_stress_x_m', 'max_stress_y_m', 'max_stress_z_m', 'max_stress_node',
+    'max_displacement_mm', 'max_disp_x_m', 'max_disp_y_m', 'max_disp_z_m', 'max_disp_node',
+    'avg_stress_mpa',
+]
+
 def run_structural_parametric_study(mapdl, node_tags, node_coords, tet_nodes, 
-                                   param_min, param_max, param_steps, material):
-    """Run parametric study varying force with comprehensive visualization"""
+                                   param_min, param_max, param_steps, material, pool=None):
+    """Run parametric study varying force with comprehensive visualization
+    
+    If pool (a MapdlPool) is given, the force values are solved in parallel
+    on its instances and mapdl is not used.
+    """
     
     print("\n" + "="*60)
     print("RUNNING STRUCTURAL PARAMETRIC STUDY")
@@ -488,87 +579,22 @@ def run_structural_parametric_study(mapdl, node_tags, node_coords, tet_nodes,
     # Generate parameter values
     forces = np.linspace(param_min, param_max, param_steps)
     
-    results_list = []
-    stress_images = []
-    displacement_images = []
+    # Every instance builds and saves its base model afresh for this study
+    forget_base_model(STRUCTURAL_BASE_DB, mapdl=mapdl, pool=pool)
     
-    # Track first and last step for detailed visualization
-    first_step = True
-    last_step_index = len(forces)
+    solve_step = partial(solve_structural_step, node_tags=node_tags, node_coords=node_coords,
+                         tet_nodes=tet_nodes, material=material, output_path=output_path,
+                         total_steps=len(forces))
+    outputs = run_sweep(solve_step, forces, mapdl=mapdl, pool=pool,
+                        batch_size=STRUCTURAL_CONFIG['batch_size'])
     
-    for i, force in enumerate(forces, 1):
-        print(f"\n[{i}/{len(forces)}] Analyzing Force = {force:.1f} N...")
-        
-        try:
-            results = run_single_structural_analysis(
-                mapdl, node_tags, node_coords, tet_nodes, material, force
-            )
-            
-            # Export contour plots for animation
-            print("  Exporting contour plots...")
-            
-            stress_img = export_stress_plot(mapdl, output_path, 
-                                           f'stress_step_{i:03d}.png', step_number=i)
-            if stress_img:
-                stress_images.append(stress_img)
-                
-            disp_img = export_displacement_plot(mapdl, output_path,
-                                               f'displacement_step_{i:03d}.png', step_number=i)
-            if disp_img:
-                displacement_images.append(disp_img)
-            
-            # Export detailed visualizations for first and last steps
-            if first_step or i == last_step_index:
-                step_label = "first" if first_step else "last"
-                print(f"  Exporting detailed {step_label} step visualizations...")
-                
-                # Stress components
-                export_stress_components(mapdl, output_path, f"stress_components_{step_label}")
-                
-                # Displacement components
-                export_displacement_components(mapdl, output_path, f"displacement_components_{step_label}")
-                
-                # Principal stresses
-                export_principal_stresses(mapdl, output_path, f"principal_stress_{step_label}")
-                
-                # Deformed shape
-                export_deformed_shape(mapdl, output_path, f"deformed_shape_{step_label}.png")
-                
-                first_step = False
-            
-            row = {
-                'run_number': i,
-                'force_n': force,
-                'max_stress_mpa': results['max_stress_mpa'],
-                'max_stress_x_m': results['max_stress_x_m'],
-                'max_stress_y_m': results['max_stress_y_m'],
-                'max_stress_z_m': results['max_stress_z_m'],
-                'max_stress_node': results['max_stress_node'],
-                'max_displacement_mm': results['max_displacement_mm'],
-                'max_disp_x_m': results['max_disp_x_m'],
-                'max_disp_y_m': results['max_disp_y_m'],
-                'max_disp_z_m': results['max_disp_z_m'],
-                'max_disp_node': results['max_disp_node'],
-                'avg_stress_mpa': results['avg_stress_mpa'],
-                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            }
-            
-            results_list.append(row)
-            
-            print(f"  ✓ Max Stress: {results['max_stress_mpa']:.2f} MPa at node {results['max_stress_node']}")
-            print(f"  ✓ Max Displacement: {results['max_displacement_mm']:.4f} mm at node {results['max_disp_node']}")
-            
-        except Exception as e:
-            print(f"  ✗ Error: {e}")
-            results_list.append({
-                'run_number': i,
-                'force_n': force,
-                'error': str(e),
-                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            })
+    results_list = [row for row, _, _ in outputs]
+    stress_images = [img for _, img, _ in outputs if img]
+    displacement_images = [img for _, _, img in outputs if img]
     
     # Create DataFrame
-    df = pd.DataFrame(results_list)
+    df = results_frame(results_list, STRUCTURAL_RESULT_COLUMNS,
+                       int_columns=('run_number', 'max_stress_node', 'max_disp_node'))
     
     # Generate comprehensive visualizations
     print("\n" + "="*60)
@@ -10,8 +10,11 @@ from datetime import datetime
 from pathlib import Path
 import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation
+from functools import partial
 from PIL import Image
 from analysis_config import THERMAL_CONFIG, register_analysis
+from analysis_pool import run_sweep, results_frame, prepare_base_model, forget_base_model
+from analysis_mesh import emit_cdb_block
 
 
 def setup_visualization_directory():
@@ -170,37 +173,43 @@ def create_thermal_mesh_in_mapdl(mapdl, node_tags, node_coords, tet_nodes):
     mapdl.finish()
     mapdl.clear()
     mapdl.prep7()
-    mapdl.units("SI")
-    
-    # Define thermal element type
-    mapdl.et(1, 278)  # SOLID278 - thermal tetrahedral
-    
-    # Create nodes
-    for node_id, coords in zip(node_tags, node_coords):
-        mapdl.n(int(node_id), coords[0], coords[1], coords[2])
+    with mapdl.non_interactive:
+        mapdl.units("SI")
+        
+        # Define thermal element type
+        mapdl.et(1, 278)  # SOLID278 - thermal tetrahedral
     
-    # Create elements
-    for tet in tet_nodes:
-        mapdl.e(int(tet[0]), int(tet[1]), int(tet[2]), int(tet[3]))
+    # Nodes and elements go over as NBLOCK/EBLOCK tables in one call
+    mapdl.input_strings(emit_cdb_block(node_tags, node_coords, tet_nodes))
 
 # ============================================================
 # SINGLE ANALYSIS RUN
 # ============================================================
 
-def run_single_thermal_analysis(mapdl, node_tags, node_coords, tet_nodes, material_props, heat_flux):
-    """Run single thermal analysis"""
-    
-    # Recreate mesh with thermal elements
+# Saved per MAPDL instance once its mesh, material and fixed temperature are built
+THERMAL_BASE_DB = 'thermal_base'
+
+def build_thermal_model(mapdl, node_tags, node_coords, tet_nodes, material_props):
+    """Build the load-independent model: mesh, material and fixed temperature"""
     create_thermal_mesh_in_mapdl(mapdl, node_tags, node_coords, tet_nodes)
     
-    # Material properties
-    mapdl.mp("KXX", 1, material_props['thermal_conductivity'])
-    mapdl.mp("DENS", 1, material_props['density'])
-    mapdl.mp("C", 1, material_props['specific_heat'])
+    with mapdl.non_interactive:
+        # Material properties
+        mapdl.mp("KXX", 1, material_props['thermal_conductivity'])
+        mapdl.mp("DENS", 1, material_props['density'])
+        mapdl.mp("C", 1, material_props['specific_heat'])
+        
+        # Boundary conditions - Fixed temperature at Z=0
+        mapdl.nsel("S", "LOC", "Z", 0)
+        mapdl.d("ALL", "TEMP", 20)
+        mapdl.allsel()
+
+def run_single_thermal_analysis(mapdl, node_tags, node_coords, tet_nodes, material_props, heat_flux):
+    """Run single thermal analysis"""
     
-    # Boundary conditions - Fixed temperature at Z=0
-    mapdl.nsel("S", "LOC", "Z", 0)
-    mapdl.d("ALL", "TEMP", 20)
+    # Mesh, material and fixed temperature are the same for every flux value
+    prepare_base_model(mapdl, THERMAL_BASE_DB, build_thermal_model,
+                       node_tags, node_coords, tet_nodes, material_props)
     
     # Apply heat flux at Z=0.05
     mapdl.allsel()
@@ -249,8 +258,58 @@ def run_single_thermal_analysis(mapdl, node_tags, node_coords, tet_nodes, materi
 # PARAMETRIC STUDY
 # ============================================================
 
+def solve_thermal_step(mapdl, run_number, flux, node_tags, node_coords, tet_nodes,
+                       material, total_steps):
+    """Solve one heat flux value and return its result row"""
+    print(f"\n[{run_number}/{total_steps}] Analyzing with Heat Flux = {flux:.1f} W/m²...")
+    
+    try:
+        results = run_single_thermal_analysis(
+            mapdl, node_tags, node_coords, tet_nodes, material, flux
+        )
+        
+        row = {
+            'run_number': run_number,
+            'heat_flux_w_m2': flux,
+            'max_temp_c': results['max_temp_c'],
+            'max_temp_x_m': results['max_temp_x_m'],
+            'max_temp_y_m': results['max_temp_y_m'],
+            'max_temp_z_m': results['max_temp_z_m'],
+            'max_temp_node': results['max_temp_node'],
+            'min_temp_c': results['min_temp_c'],
+            'min_temp_x_m': results['min_temp_x_m'],
+            'min_temp_y_m': results['min_temp_y_m'],
+            'min_temp_z_m': results['min_temp_z_m'],
+            'min_temp_node': results['min_temp_node'],
+            'avg_temp_c': results['avg_temp_c'],
+            'temp_range_c': results['temp_range_c'],
+            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        
+        print(f"  ✓ Max Temp: {results['max_temp_c']:.2f}°C")
+        print(f"  ✓ Temp Range: {results['temp_range_c']:.2f}°C")
+        
+    except Exception as e:
+        print(f"  ✗ Error: {e}")
+        row = {
+            'run_number': run_number,
+            'heat_flux_w_m2': flux,
+            'error': str(e),
+            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        }
+    
+    return row
+
+# Numeric columns of the results table, in output order
+THERMAL_RESULT_COLUMNS = [
+    'run_number', 'heat_flux_w_m2',
+    'max_temp_c', 'max_temp_x_m', 'max_temp_y_m', 'max_temp_z_m', 'max_temp_node',
+    'min_temp_c', 'min_temp_x_m', 'min_temp_y_m', 'min_temp_z_m', 'min_temp_node',
+    'avg_temp_c', 'temp_range_c',
+]
+
 def run_thermal_parametric_study(mapdl, node_tags, node_coords, tet_nodes,
-                                param_min, param_max, param_steps, material):
+                                param_min, param_max, param_steps, material, pool=None):
     """
     Run parametric study varying heat flux
     
@@ -263,6 +322,7 @@ def run_thermal_parametric_study(mapdl, node_tags, node_coords, tet_nodes,
         param_max: Maximum heat flux value (W/m²)
         param_steps: Number of steps
         material: Dictionary of material properties
+        pool: Optional MapdlPool to solve the steps in parallel (mapdl unused)
     
     Returns:
         df: DataFrame with results
@@ -278,50 +338,17 @@ def run_thermal_parametric_study(mapdl, node_tags, node_coords, tet_nodes,
     # Generate parameter values
     fluxes = np.linspace(param_min, param_max, param_steps)
     
-    results_list = []
+    # Every instance builds and saves its base model afresh for this study
+    forget_base_model(THERMAL_BASE_DB, mapdl=mapdl, pool=pool)
     
-    for i, flux in enumerate(fluxes, 1):
-        print(f"\n[{i}/{len(fluxes)}] Analyzing with Heat Flux = {flux:.1f} W/m²...")
-        
-        try:
-            results = run_single_thermal_analysis(
-                mapdl, node_tags, node_coords, tet_nodes, material, flux
-            )
-            
-            row = {
-                'run_number': i,
-                'heat_flux_w_m2': flux,
-                'max_temp_c': results['max_temp_c'],
-                'max_temp_x_m': results['max_temp_x_m'],
-                'max_temp_y_m': results['max_temp_y_m'],
-                'max_temp_z_m': results['max_temp_z_m'],
-                'max_temp_node': results['max_temp_node'],
-                'min_temp_c': results['min_temp_c'],
-                'min_temp_x_m': results['min_temp_x_m'],
-                'min_temp_y_m': results['min_temp_y_m'],
-                'min_temp_z_m': results['min_temp_z_m'],
-                'min_temp_node': results['min_temp_node'],
-                'avg_temp_c': results['avg_temp_c'],
-                'temp_range_c': results['temp_range_c'],
-                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            }
-            
-            results_list.append(row)
-            
-            print(f"  ✓ Max Temp: {results['max_temp_c']:.2f}°C")
-            print(f"  ✓ Temp Range: {results['temp_range_c']:.2f}°C")
-            
-        except Exception as e:
-            print(f"  ✗ Error: {e}")
-            results_list.append({
-                'run_number': i,
-                'heat_flux_w_m2': flux,
-                'error': str(e),
-                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            })
+    solve_step = partial(solve_thermal_step, node_tags=node_tags, node_coords=node_coords,
+                         tet_nodes=tet_nodes, material=material, total_steps=len(fluxes))
+    results_list = run_sweep(solve_step, fluxes, mapdl=mapdl, pool=pool,
+                             batch_size=THERMAL_CONFIG['batch_size'])
     
     # Create DataFrame
-    df = pd.DataFrame(results_list)
+    df = results_frame(results_list, THERMAL_RESULT_COLUMNS,
+                       int_columns=('run_number', 'max_temp_node', 'min_temp_node'))
     
     # Save to Excel
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
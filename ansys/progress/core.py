@@ -5,6 +5,9 @@ Handles meshing, user interaction, and delegates to specific analysis modules
 """
 
 import os
+import json
+import hashlib
+import argparse
 import numpy as np
 import gmsh
 from ansys.mapdl.core import launch_mapdl
@@ -18,16 +21,56 @@ sys.path.append(os.path.join(os.path.dirname(__file__), 'analysis-functions'))
 from analysis_structural import run_structural_parametric_study
 from analysis_thermal import run_thermal_parametric_study
 from analysis_config import ANALYSIS_REGISTRY
+from analysis_pool import launch_mapdl_pool
 
 ANSYS_PATH = r"C:\Program Files\ANSYS Inc\ANSYS Student\v252\ansys\bin\winx64\ANSYS252.exe"
 
+# Meshes from previous runs, keyed on the STEP file contents and mesh size
+MESH_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "fea")
+
+# Set FEA_GMSH_HXT=1 to use Gmsh's parallel HXT tet mesher (faster, less robust)
+USE_HXT = os.environ.get("FEA_GMSH_HXT", "0") == "1"
+
+# Gmsh options that shape the mesh (sizes are set per call); part of the cache key
+MESH_OPTIONS = {
+    # Refine only where the surface curves instead of everywhere
+    "Mesh.CharacteristicLengthFromCurvature": 1,
+    "Mesh.MinimumCirclePoints": 12,
+}
+if USE_HXT:
+    MESH_OPTIONS["Mesh.Algorithm3D"] = 10  # HXT
+
 # ============================================================
 # MESHING FUNCTIONS
 # ============================================================
 
-def import_and_mesh_cad(step_file, mesh_size):
-    """Import CAD and create mesh using Gmsh"""
-    print(f"\nCreating mesh with size {mesh_size} mm...")
+def mesh_cache_path(step_file, mesh_size, max_mesh_size):
+    """Cache file for a STEP file meshed with the given size limits and MESH_OPTIONS"""
+    digest = hashlib.blake2b()
+    with open(step_file, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    digest.update(f"{mesh_size}:{max_mesh_size}".encode())
+    digest.update(json.dumps(MESH_OPTIONS, sort_keys=True).encode())
+    return os.path.join(MESH_CACHE_DIR, f"{digest.hexdigest()}.npz")
+
+def import_and_mesh_cad(step_file, mesh_size, max_mesh_size=None):
+    """Import CAD and create mesh using Gmsh (reused from the cache when possible)
+    
+    Elements are mesh_size near curved features and grow up to max_mesh_size
+    (default 3 x mesh_size) in the bulk.
+    """
+    if max_mesh_size is None:
+        max_mesh_size = mesh_size * 3
+    cache_path = mesh_cache_path(step_file, mesh_size, max_mesh_size)
+    if os.path.exists(cache_path):
+        with np.load(cache_path) as cached:
+            node_tags, node_coords, tet_nodes = (
+                cached['node_tags'], cached['node_coords'], cached['tet_nodes'])
+        print(f"\n✓ Mesh loaded from cache: {len(node_tags)} nodes, {len(tet_nodes)} elements")
+        return node_tags, node_coords, tet_nodes
+    
+    print(f"\nCreating mesh with size {mesh_size}-{max_mesh_size} mm...")
     
     gmsh.initialize()
     gmsh.option.setNumber("General.Terminal", 0)
@@ -35,40 +78,92 @@ def import_and_mesh_cad(step_file, mesh_size):
     gmsh.model.occ.importShapes(step_file)
     gmsh.model.occ.synchronize()
     gmsh.option.setNumber("Mesh.CharacteristicLengthMin", mesh_size)
-    gmsh.option.setNumber("Mesh.CharacteristicLengthMax", mesh_size)
+    gmsh.option.setNumber("Mesh.CharacteristicLengthMax", max_mesh_size)
+    for name, value in MESH_OPTIONS.items():
+        gmsh.option.setNumber(name, value)
+    gmsh.option.setNumber("General.NumThreads", os.cpu_count() or 1)
+    gmsh.option.setNumber("Mesh.MaxNumThreads3D", os.cpu_count() or 1)
     gmsh.model.mesh.generate(3)
     
-    node_tags, node_coords, _ = gmsh.model.mesh.getNodes()
-    node_coords = node_coords.reshape(-1, 3) / 1000.0  # Convert to meters
+    # Skip the parametric coordinates: they are never used and add a second
+    # per-node array to the transfer out of Gmsh
+    node_tags, node_coords, _ = gmsh.model.mesh.getNodes(returnParametricCoord=False)
+    node_coords = node_coords.reshape(-1, 3)
+    node_coords *= 1e-3  # Convert to meters in place
     
     elem_types, elem_tags, elem_node_tags = gmsh.model.mesh.getElements(3)
-    tet_index = [i for i, et in enumerate(elem_types) if et == 4][0]
-    tet_nodes = elem_node_tags[tet_index].reshape(-1, 4)
+    tet_index = list(elem_types).index(4)  # Linear tetrahedron
+    tet_nodes = elem_node_tags[tet_index].astype(np.int32).reshape(-1, 4)
     
     gmsh.finalize()
     
     print(f"✓ Mesh created: {len(node_tags)} nodes, {len(tet_nodes)} elements")
+    
+    _, volumes = compute_tet_geometry(node_tags, node_coords, tet_nodes)
+    print(f"  Meshed volume: {np.abs(volumes).sum():.6e} m³")
+    if (volumes <= 0).any():
+        print(f"  ⚠ {(volumes <= 0).sum()} inverted or degenerate elements")
+    
+    os.makedirs(MESH_CACHE_DIR, exist_ok=True)
+    np.savez_compressed(cache_path, node_tags=node_tags, node_coords=node_coords, tet_nodes=tet_nodes)
     return node_tags, node_coords, tet_nodes
 
+def compute_tet_geometry(node_tags, node_coords, tet_nodes):
+    """
+    Vectorized per-element geometry of a linear tet mesh
+    
+    Returns:
+        centroids: (Ne, 3) element centroids
+        volumes: (Ne,) signed element volumes (negative = inverted element)
+    """
+    # Gmsh node tags need not be contiguous, so map them to coordinate rows
+    tag_to_row = np.empty(int(node_tags.max()) + 1, dtype=np.int64)
+    tag_to_row[node_tags.astype(np.int64)] = np.arange(len(node_tags))
+    
+    pts = node_coords[tag_to_row[tet_nodes]]  # (Ne, 4, 3)
+    centroids = pts.mean(axis=1)
+    edges = pts[:, 1:] - pts[:, :1]           # (Ne, 3, 3)
+    volumes = np.einsum('ij,ij->i', edges[:, 0], np.cross(edges[:, 1], edges[:, 2])) / 6.0
+    
+    return centroids, volumes
+
 # ============================================================
 # USER INPUT COLLECTION
 # ============================================================
 
-def get_common_inputs():
+def ask(prompt, study_config=None, key=None):
+    """Return the study config value for key, or prompt the user for it"""
+    if study_config and key in study_config:
+        value = str(study_config[key])
+        print(f"{prompt}{value}")
+        return value
+    return input(prompt)
+
+def load_study_config(config_path):
+    """Load a JSON study config (see configs/cube_force_sweep.json)"""
+    with open(config_path, encoding='utf-8') as f:
+        return json.load(f)
+
+def get_common_inputs(study_config=None):
     """Get inputs common to all analyses"""
     print("\n" + "="*60)
     print("COMMON INPUTS")
     print("="*60)
     
-    step_file = input("\nEnter STEP file path: ").strip().strip('"')
-    mesh_size = float(input("Mesh size (mm) [8.0]: ") or 8.0)
+    step_file = ask("\nEnter STEP file path: ", study_config, 'step_file').strip().strip('"')
+    mesh_size = float(ask("Mesh size (mm) [8.0]: ", study_config, 'mesh_size') or 8.0)
+    max_mesh_size = float(ask(f"Max mesh size away from curved features (mm) [{mesh_size * 3}]: ",
+                              study_config, 'max_mesh_size') or mesh_size * 3)
+    n_instances = int(ask("Parallel MAPDL instances [1]: ", study_config, 'n_instances') or 1)
     
     return {
         'step_file': step_file,
-        'mesh_size': mesh_size
+        'mesh_size': mesh_size,
+        'max_mesh_size': max_mesh_size,
+        'n_instances': n_instances
     }
 
-def get_analysis_specific_inputs(analysis_type):
+def get_analysis_specific_inputs(analysis_type, study_config=None):
     """Get inputs specific to the selected analysis type"""
     if analysis_type not in ANALYSIS_REGISTRY:
         raise ValueError(f"Unknown analysis type: {analysis_type}")
@@ -82,18 +177,23 @@ def get_analysis_specific_inputs(analysis_type):
     
     # Get parametric study parameters
     print(f"\n{config['parameter_name']} range:")
-    inputs['param_min'] = float(input(f"  Minimum {config['parameter_name']} ({config['parameter_unit']}) [{config['param_min_default']}]: ") 
+    inputs['param_min'] = float(ask(f"  Minimum {config['parameter_name']} ({config['parameter_unit']}) [{config['param_min_default']}]: ",
+                                    study_config, 'param_min')
                                 or config['param_min_default'])
-    inputs['param_max'] = float(input(f"  Maximum {config['parameter_name']} ({config['parameter_unit']}) [{config['param_max_default']}]: ") 
+    inputs['param_max'] = float(ask(f"  Maximum {config['parameter_name']} ({config['parameter_unit']}) [{config['param_max_default']}]: ",
+                                    study_config, 'param_max')
                                 or config['param_max_default'])
-    inputs['param_steps'] = int(input(f"  Number of steps [{config['param_steps_default']}]: ") 
+    inputs['param_steps'] = int(ask(f"  Number of steps [{config['param_steps_default']}]: ",
+                                    study_config, 'param_steps')
                               or config['param_steps_default'])
     
     # Get material properties
     print(f"\nMaterial properties:")
     material = {}
+    material_config = (study_config or {}).get('material')
     for prop_key, prop_config in config['material_properties'].items():
-        value = input(f"  {prop_config['name']} ({prop_config['unit']}) [{prop_config['default']}]: ")
+        value = ask(f"  {prop_config['name']} ({prop_config['unit']}) [{prop_config['default']}]: ",
+                    material_config, prop_key)
         material[prop_key] = float(value) if value else prop_config['default']
     
     inputs['material'] = material
@@ -104,14 +204,20 @@ def get_analysis_specific_inputs(analysis_type):
 # MAIN WORKFLOW
 # ============================================================
 
-def run_parametric_study():
-    """Main workflow: mesh -> select analysis -> run study"""
+def run_parametric_study(config_path=None):
+    """Main workflow: mesh -> select analysis -> run study
+    
+    If config_path points to a JSON study config, its values answer the
+    prompts; anything missing from it is still asked interactively.
+    """
+    study_config = load_study_config(config_path) if config_path else None
     
     # Step 1: Get common inputs and create mesh
-    common_inputs = get_common_inputs()
+    common_inputs = get_common_inputs(study_config)
     node_tags, node_coords, tet_nodes = import_and_mesh_cad(
         common_inputs['step_file'], 
-        common_inputs['mesh_size']
+        common_inputs['mesh_size'],
+        common_inputs['max_mesh_size']
     )
     
     # Step 2: Select analysis type
@@ -122,20 +228,26 @@ def run_parametric_study():
     for key, config in ANALYSIS_REGISTRY.items():
         print(f"{key}. {config['name']}")
     
-    analysis_choice = input("\nEnter choice: ").strip()
+    analysis_choice = ask("\nEnter choice: ", study_config, 'analysis').strip()
     
     if analysis_choice not in ANALYSIS_REGISTRY:
         print("Invalid choice!")
         return
     
     # Step 3: Get analysis-specific inputs
-    analysis_inputs = get_analysis_specific_inputs(analysis_choice)
+    analysis_inputs = get_analysis_specific_inputs(analysis_choice, study_config)
     
     # Step 4: Launch MAPDL
     print("\n" + "="*60)
     print("LAUNCHING ANSYS MAPDL")
     print("="*60)
-    mapdl = launch_mapdl(exec_file=ANSYS_PATH)
+    # Independent parameter points run on a persistent pool when requested
+    pool = None
+    mapdl = None
+    if common_inputs['n_instances'] > 1:
+        pool = launch_mapdl_pool(ANSYS_PATH, common_inputs['n_instances'])
+    else:
+        mapdl = launch_mapdl(exec_file=ANSYS_PATH)
     print("✓ MAPDL launched")
     
     # Step 5: Run the selected analysis
@@ -150,7 +262,8 @@ def run_parametric_study():
             param_min=analysis_inputs['param_min'],
             param_max=analysis_inputs['param_max'],
             param_steps=analysis_inputs['param_steps'],
-            material=analysis_inputs['material']
+            material=analysis_inputs['material'],
+            pool=pool
         )
         
         print("\n" + "="*60)
@@ -163,7 +276,10 @@ def run_parametric_study():
         import traceback
         traceback.print_exc()
     finally:
-        mapdl.exit()
+        if pool is not None:
+            pool.exit()
+        else:
+            mapdl.exit()
         print("\n✓ MAPDL closed")
 
 # ============================================================
@@ -172,18 +288,23 @@ def run_parametric_study():
 
 def main():
     """Main entry point"""
+    parser = argparse.ArgumentParser(description="Parametric FEA study tool")
+    parser.add_argument('--config', help="JSON study config for unattended runs")
+    args = parser.parse_args()
+    
     print("="*60)
     print("PARAMETRIC FEA STUDY TOOL")
     print("="*60)
     
     try:
-        run_parametric_study()
+        run_parametric_study(args.config)
     except Exception as e:
         print(f"\n✗ Error: {e}")
         import traceback
         traceback.print_exc()
     
-    input("\nPress Enter to exit...")
+    if not args.config:
+        input("\nPress Enter to exit...")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
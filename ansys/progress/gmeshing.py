@@ -113,9 +113,9 @@ try:
     # Extract only tetrahedral cells (cell type 10 in VTK)
     # Cell types: 5=triangle, 10=tetrahedron, 12=hexahedron
     cell_types = mesh.celltypes
-    unique_types = np.unique(cell_types)
+    unique_types, type_counts = np.unique(cell_types, return_counts=True)
     
-    print(f"Cell types found: {unique_types}")
+    print(f"Cell types found: {dict(zip(unique_types.tolist(), type_counts.tolist()))}")
     print("  Type 5 = Triangle (surface)")
     print("  Type 10 = Tetrahedron (volume)")
     
@@ -128,13 +128,8 @@ try:
         input("Press Enter to exit...")
         exit()
     
-    # Create new mesh with only tetrahedrons
-    tet_cells = []
-    cell_offset = 0
-    
-    for i, cell_type in enumerate(cell_types):
-        if cell_type == 10:  # Tetrahedron
-            tet_cells.append(i)
+    # Indices of the tetrahedrons, taken from the mask in one pass
+    tet_cells = np.flatnonzero(tet_mask)
     
     print(f"\nFound {len(tet_cells)} tetrahedral elements out of {mesh.n_cells} total")
     
@@ -76,7 +76,7 @@ def import_and_mesh_cad(step_file, mesh_size=8.0):
     
     # Get tetrahedrons
     elem_types, elem_tags, elem_node_tags = gmsh.model.mesh.getElements(3)
-    tet_index = [i for i, et in enumerate(elem_types) if et == 4][0]
+    tet_index = list(elem_types).index(4)  # Linear tetrahedron
     tet_nodes = elem_node_tags[tet_index].reshape(-1, 4)
     
     print(f"✓ Mesh created: {len(node_tags)} nodes, {len(tet_nodes)} elements")
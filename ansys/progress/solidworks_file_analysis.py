@@ -10,23 +10,99 @@ pip install pyvista
 pip install matplotlib
 
 Note: Ensure ANSYS MAPDL is installed on your system.
+
+Usage:
+------
+python solidworks_file_analysis.py                      # interactive menu
+python solidworks_file_analysis.py --config run.json    # scripted run
+
+The config maps prompt keys to answers, e.g.
+{"analysis": "1", "file": "cube", "cube_size": 0.1, "material": "1",
+ "esize": 0.005, "fix_area": 1, "force_area": 2, "force_val": 1000}
+Area prompts accept several areas, e.g. "1, 3" or [1, 3] in a config.
+Any prompt missing from the config falls back to interactive input.
+YAML configs (.yaml/.yml) additionally require: pip install pyyaml
 """
 
 import os
+import re
 import sys
+import json
+import argparse
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
-import pyvista as pv
 from ansys.mapdl.core import launch_mapdl
-from ansys.mapdl.core.plotting import GraphicsBackend
-from ansys.mapdl.core.plotting.theme import PyMAPDL_cmap
+
+
+# CAD extensions accepted by get_file_path / import_cad_geometry
+SUPPORTED_EXTS = frozenset({'.sldprt', '.step', '.stp', '.iges', '.igs', '.sat'})
+STEP_EXTS = frozenset({'.step', '.stp'})
+IGES_EXTS = frozenset({'.iges', '.igs'})
+
+# Above this many nodes the PCG Lanczos eigensolver beats Block Lanczos
+LANPCG_NODE_THRESHOLD = 50_000
+
+# Visualization grid, re-fetched only when mesh_volumes() produced a new mesh
+_grid_cache = {'generation': 0, 'grid_generation': None, 'grid': None}
+
+# (element type, element size) of the mesh currently in MAPDL, None if unmeshed
+_mesh_state = {'key': None}
+
+# Print every entity count after import, not just the ones decisions need
+VERBOSE = False
+
+# Answers loaded from --config; prompts whose key is present are skipped
+_config = {}
+
+# Material presets offered by get_material_properties (SI units)
+MATERIAL_PRESETS = {
+    '1': {'name': 'Structural Steel', 'ex': 2e11, 'nuxy': 0.3, 'dens': 7850, 'kxx': 60.5, 'c': 434, 'murx': 1},
+    '2': {'name': 'Aluminum Alloy', 'ex': 7.1e10, 'nuxy': 0.33, 'dens': 2770, 'kxx': 170, 'c': 875, 'murx': 1},
+    '3': {'name': 'Titanium Alloy', 'ex': 9.6e10, 'nuxy': 0.36, 'dens': 4620, 'kxx': 7.2, 'c': 580, 'murx': 1},
+    '4': {'name': 'Copper', 'ex': 1.2e11, 'nuxy': 0.34, 'dens': 8900, 'kxx': 385, 'c': 385, 'murx': 1},
+}
+
+# Default element size is the part's bounding-box diagonal over this
+ESIZE_DIAG_DIVISOR = 40
+
+# MP label -> material dict key, for assign_material()
+MP_KEYS = {'EX': 'ex', 'NUXY': 'nuxy', 'DENS': 'dens', 'KXX': 'kxx', 'C': 'c', 'MURX': 'murx'}
+
+
+def load_config(path):
+    """Load prompt answers from a JSON or YAML config file"""
+    with open(path, encoding='utf-8') as f:
+        if os.path.splitext(path)[1].lower() in ('.yaml', '.yml'):
+            import yaml  # Optional dependency, only needed for YAML configs
+            return yaml.safe_load(f) or {}
+        return json.load(f)
+
+
+def _ask(prompt, key):
+    """Return the configured answer for key, or prompt the user for it"""
+    if key in _config:
+        value = str(_config[key])
+        print(f"{prompt.strip()} {value}")
+        return value
+    return input(prompt).strip()
+
+
+def _pause(prompt):
+    """Wait for Enter in interactive mode; no-op for config-driven runs"""
+    if not _config:
+        input(prompt)
+
+
+def print_banner(title, char="="):
+    """Print a section banner as one console write instead of three"""
+    rule = char * 60
+    print(f"\n{rule}\n{title}\n{rule}")
 
 
 def display_menu():
     """Display analysis type menu"""
-    print("\n" + "="*60)
-    print("ANSYS MAPDL ANALYSIS TOOL")
-    print("="*60)
+    print_banner("ANSYS MAPDL ANALYSIS TOOL")
     print("\nSelect Analysis Type:")
     print("1. Static Structural Analysis")
     print("2. Modal Analysis (Natural Frequencies)")
@@ -39,19 +115,17 @@ def display_menu():
 
 
 def get_file_path():
-    """Get CAD file path from user"""
-    print("\n" + "-"*60)
-    print("CAD FILE IMPORT")
-    print("-"*60)
+    """Get CAD file path from user, returned as (path, lowercase extension)"""
+    print_banner("CAD FILE IMPORT", "-")
     print("\nSupported formats: .step, .stp, .iges, .igs, .sat")
     print("(For SolidWorks .sldprt files, export to STEP format first)")
     print("\nOr type 'cube' to create a simple test cube")
     
-    file_path = input("\nEnter the full path to your CAD file (or 'cube'): ").strip().strip('"')
+    file_path = _ask("\nEnter the full path to your CAD file (or 'cube'): ", 'file').strip('"')
     
     # Check if user wants to create a cube
     if file_path.lower() == 'cube':
-        return 'CREATE_CUBE'
+        return 'CREATE_CUBE', None
     
     # Handle relative paths
     if not os.path.isabs(file_path):
@@ -65,25 +139,23 @@ def get_file_path():
         print("\nTip: Use full path or relative path like:")
         print("     ../solidworks-parts/CUBE.step")
         print("     Or type 'cube' to create a test geometry")
-        return None
+        return None, None
     
     ext = os.path.splitext(file_path)[1].lower()
-    if ext not in ['.sldprt', '.step', '.stp', '.iges', '.igs', '.sat']:
+    if ext not in SUPPORTED_EXTS:
         print(f"✗ ERROR: Unsupported file format: {ext}")
         print("   Supported formats: .sldprt, .step, .iges, .sat")
-        return None
+        return None, None
     
     print(f"✓ File found: {os.path.basename(file_path)}")
-    return file_path
+    return file_path, ext
 
 
 def create_cube_geometry(mapdl):
     """Create a simple cube geometry in MAPDL"""
-    print("\n" + "-"*60)
-    print("CREATING TEST CUBE GEOMETRY")
-    print("-"*60)
+    print_banner("CREATING TEST CUBE GEOMETRY", "-")
     
-    size = float(input("Enter cube size in meters (e.g., 0.1 for 10cm): ") or "0.1")
+    size = float(_ask("Enter cube size in meters (e.g., 0.1 for 10cm): ", 'cube_size') or "0.1")
     
     print(f"\nCreating {size}m x {size}m x {size}m cube...")
     
@@ -96,9 +168,7 @@ def create_cube_geometry(mapdl):
     num_vols = mapdl.get('_', 'VOLU', 0, 'COUNT')
     num_areas = mapdl.get('_', 'AREA', 0, 'COUNT')
     
-    print("\n" + "-"*60)
-    print("GEOMETRY CREATION SUMMARY")
-    print("-"*60)
+    print_banner("GEOMETRY CREATION SUMMARY", "-")
     print(f"Volumes created: {int(num_vols)}")
     print(f"Areas created: {int(num_areas)}")
     
@@ -113,9 +183,7 @@ def create_cube_geometry(mapdl):
 
 def get_material_properties():
     """Get material properties from user"""
-    print("\n" + "-"*60)
-    print("MATERIAL PROPERTIES")
-    print("-"*60)
+    print_banner("MATERIAL PROPERTIES", "-")
     print("Select material preset:")
     print("1. Structural Steel")
     print("2. Aluminum Alloy")
@@ -123,53 +191,105 @@ def get_material_properties():
     print("4. Copper")
     print("5. Custom Material")
     
-    choice = input("\nEnter choice (1-5): ").strip()
-    
-    materials = {
-        '1': {'name': 'Structural Steel', 'ex': 2e11, 'nuxy': 0.3, 'dens': 7850, 'kxx': 60.5, 'c': 434, 'murx': 1},
-        '2': {'name': 'Aluminum Alloy', 'ex': 7.1e10, 'nuxy': 0.33, 'dens': 2770, 'kxx': 170, 'c': 875, 'murx': 1},
-        '3': {'name': 'Titanium Alloy', 'ex': 9.6e10, 'nuxy': 0.36, 'dens': 4620, 'kxx': 7.2, 'c': 580, 'murx': 1},
-        '4': {'name': 'Copper', 'ex': 1.2e11, 'nuxy': 0.34, 'dens': 8900, 'kxx': 385, 'c': 385, 'murx': 1},
-    }
+    choice = _ask("\nEnter choice (1-5): ", 'material')
     
-    if choice in materials:
-        mat = materials[choice]
+    if choice in MATERIAL_PRESETS:
+        mat = MATERIAL_PRESETS[choice]
         print(f"\nSelected: {mat['name']}")
         return mat
     elif choice == '5':
         print("\nEnter custom material properties:")
         return {
             'name': 'Custom Material',
-            'ex': float(input("Young's Modulus (Pa): ")),
-            'nuxy': float(input("Poisson's Ratio: ")),
-            'dens': float(input("Density (kg/m³): ")),
-            'kxx': float(input("Thermal Conductivity (W/m·K): ")),
-            'c': float(input("Specific Heat (J/kg·K): ")),
-            'murx': float(input("Relative Permeability (for magnetic): "))
+            'ex': float(_ask("Young's Modulus (Pa): ", 'ex')),
+            'nuxy': float(_ask("Poisson's Ratio: ", 'nuxy')),
+            'dens': float(_ask("Density (kg/m³): ", 'dens')),
+            'kxx': float(_ask("Thermal Conductivity (W/m·K): ", 'kxx')),
+            'c': float(_ask("Specific Heat (J/kg·K): ", 'c')),
+            'murx': float(_ask("Relative Permeability (for magnetic): ", 'murx'))
         }
     else:
         print("Invalid choice. Using Structural Steel as default.")
-        return materials['1']
+        return MATERIAL_PRESETS['1']
 
 
 import os
 import traceback
 # Make sure to import traceback at the top of your file if it's not already there
 
-def import_cad_geometry(mapdl, file_path):
-    """Import CAD geometry into MAPDL with geometry repair"""
+def get_many(mapdl, queries):
+    """Run several *GET queries in one batch and return their values
+    
+    Each query is the *GET argument tuple after the parameter name, e.g.
+    ('KP', 0, 'COUNT'); all results come back in a single array fetch.
+    """
+    with mapdl.non_interactive:
+        mapdl.run("*DEL,PYGETV,,NOPR")
+        mapdl.run(f"*DIM,PYGETV,ARRAY,{len(queries)}")
+        for i, query in enumerate(queries, 1):
+            mapdl.run(f"*GET,PYGETV({i})," + ",".join(str(arg) for arg in query))
+    return np.atleast_1d(mapdl.parameters['PYGETV']).ravel()[:len(queries)]
+
+
+def count_entities(mapdl, *entities):
+    """COUNT of each entity type ('KP', 'LINE', 'AREA', 'VOLU') in one batch"""
+    return [int(count) for count in get_many(mapdl, [(entity, 0, 'COUNT') for entity in entities])]
+
+
+def get_geometry_counts(mapdl):
+    """Return (keypoints, lines, areas, volumes) entity counts
+    
+    Keypoint/line/area counts are only needed to rebuild an import without
+    volumes, so they are skipped (None) when volumes exist unless VERBOSE.
+    """
+    num_vols = int(mapdl.get('_', 'VOLU', 0, 'COUNT'))
+    if num_vols > 0 and not VERBOSE:
+        return None, None, None, num_vols
+    
+    num_kps, num_lines, num_areas = count_entities(mapdl, 'KP', 'LINE', 'AREA')
+    return num_kps, num_lines, num_areas, num_vols
+
+
+def print_geometry_counts(num_kps, num_lines, num_areas, num_vols):
+    """Print the entity counts that were queried"""
+    for label, count in (("Keypoints", num_kps), ("Lines", num_lines),
+                         ("Areas", num_areas), ("Volumes", num_vols)):
+        if count is not None:
+            print(f"{label}: {count}")
+
+
+def discard_partial_import(mapdl):
+    """Delete entities left by a failed import attempt instead of mapdl.clear()"""
+    if int(mapdl.get('_', 'KP', 0, 'COUNT')) == 0:
+        return  # Attempt failed cleanly, nothing to remove
+    
+    mapdl.allsel()
+    mapdl.vdele('ALL', '', '', 1)  # Volumes plus their areas/lines/keypoints
+    mapdl.adele('ALL', '', '', 1)  # Any free areas
+    mapdl.ldele('ALL', '', '', 1)  # Any free lines
+    mapdl.kdele('ALL')             # Any free keypoints
+
+
+def import_cad_geometry(mapdl, file_path, ext=None):
+    """Import CAD geometry into MAPDL with geometry repair
+    
+    ext is the lowercase extension already computed by get_file_path().
+    """
     print(f"\nImporting CAD file...")
     print(f"File: {os.path.basename(file_path)}")
     
     try:
-        ext = os.path.splitext(file_path)[1].lower()
+        if ext is None:
+            ext = os.path.splitext(file_path)[1].lower()
         
-        if ext in ['.step', '.stp']:
+        if ext in STEP_EXTS:
             print("Format: STEP")
             
-            # Upload file to MAPDL working directory
+            # Upload file to MAPDL working directory in the background so the
+            # transfer overlaps with the PREP7 setup that doesn't need the file
             print("Uploading file to ANSYS working directory...")
-            mapdl.upload(file_path)
+            upload_pool = ThreadPoolExecutor(max_workers=1)
+            upload_future = upload_pool.submit(mapdl.upload, file_path)
             
             # Get just the filename
             filename_only = os.path.basename(file_path)
@@ -179,11 +299,17 @@ def import_cad_geometry(mapdl, file_path):
             # **********************************
             
             import_success = False
+            file_uploaded = False
             
             # --- ATTEMPT 1: PARAIN (PREP7 Command) ---
             print("... trying PARAIN command (Method 1)...")
             try:
-                mapdl.prep7() # Ensure we are in PREP7
+                try:
+                    mapdl.prep7() # Ensure we are in PREP7
+                finally:
+                    upload_pool.shutdown() # Wait for upload before PARAIN
+                upload_future.result()
+                file_uploaded = True
                 mapdl.run(f"PARAIN,'{filename_only}',STEP")
                 num_vols = int(mapdl.get('_', 'VOLU', 0, 'COUNT'))
                 if num_vols > 0:
@@ -198,9 +324,11 @@ def import_cad_geometry(mapdl, file_path):
             if not import_success:
                 print("... trying ~PARAIN command (Method 2)...")
                 try:
-                    mapdl.clear() # Clear the failed attempt
                     mapdl.prep7()
-                    mapdl.upload(file_path) # Re-upload
+                    discard_partial_import(mapdl) # Remove leftovers of the failed attempt
+                    if not file_uploaded:
+                        mapdl.upload(file_path) # Retry the upload
+                        file_uploaded = True
                     mapdl.run(f"~PARAIN,'{filename_only}',STEP")
                     num_vols = int(mapdl.get('_', 'VOLU', 0, 'COUNT'))
                     if num_vols > 0:
@@ -215,21 +343,24 @@ def import_cad_geometry(mapdl, file_path):
             if not import_success:
                 print("... trying IGESIN command (Method 3)...")
                 try:
-                    mapdl.clear() # Clear the failed attempt
                     mapdl.prep7()
-                    mapdl.upload(file_path) # Re-upload
+                    discard_partial_import(mapdl) # Remove leftovers of the failed attempt
+                    if not file_uploaded:
+                        mapdl.upload(file_path) # Retry the upload
+                        file_uploaded = True
                     
                     # Get base and extension separately
                     file_base = os.path.splitext(filename_only)[0]
                     file_ext_only = os.path.splitext(filename_only)[1].replace('.', '').upper()
 
-                    mapdl.aux15() # Switch to AUX15
                     print("   - Setting AUX15 options...")
-                    mapdl.ioptn('IGES', 'NO')
-                    mapdl.ioptn('MERGE', 'YES')
-                    mapdl.ioptn('SOLID', 'YES')
-                    mapdl.ioptn('SMALL', 'YES')
-                    mapdl.ioptn('GTOLER', 'DEFA')
+                    with mapdl.non_interactive:
+                        mapdl.aux15() # Switch to AUX15
+                        mapdl.ioptn('IGES', 'NO')
+                        mapdl.ioptn('MERGE', 'YES')
+                        mapdl.ioptn('SOLID', 'YES')
+                        mapdl.ioptn('SMALL', 'YES')
+                        mapdl.ioptn('GTOLER', 'DEFA')
                     
                     print(f"   - Running IGESIN, '{file_base}', '{file_ext_only}'")
                     mapdl.igesin(file_base, file_ext_only) # Use correct args
@@ -260,27 +391,24 @@ def import_cad_geometry(mapdl, file_path):
             print("\n--- Initial Geometry Check ---")
             mapdl.nummrg('KP')  # Merge coincident keypoints
             
-            # Glue overlapping entities
+            # Glue overlapping entities in one batch (no decisions needed in between)
             try:
-                mapdl.vglue('ALL')  # Glue volumes
-                mapdl.aglue('ALL')  # Glue areas
-                mapdl.lglue('ALL')  # Glue lines
-            except:
-                pass  # Ignore if nothing to glue
+                with mapdl.non_interactive:
+                    mapdl.vglue('ALL')  # Glue volumes
+                    mapdl.aglue('ALL')  # Glue areas
+                    mapdl.lglue('ALL')  # Glue lines
+            except Exception as e:
+                print(f"  Glue skipped: {e}")  # Usually nothing to glue
             
             # Get counts
-            num_kps = int(mapdl.get('_', 'KP', 0, 'COUNT'))
-            num_lines = int(mapdl.get('_', 'LINE', 0, 'COUNT'))
-            num_areas = int(mapdl.get('_', 'AREA', 0, 'COUNT'))
-            num_vols = int(mapdl.get('_', 'VOLU', 0, 'COUNT'))
+            num_kps, num_lines, num_areas, num_vols = get_geometry_counts(mapdl)
+            print_geometry_counts(num_kps, num_lines, num_areas, num_vols)
             
-            print(f"Keypoints: {num_kps}")
-            print(f"Lines: {num_lines}")
-            print(f"Areas: {num_areas}")
-            print(f"Volumes: {num_vols}")
-            
-            # If we have keypoints but no volumes, try to rebuild
-            if num_kps > 0 and num_vols == 0:
+            # If we have keypoints but no volumes, try to rebuild.
+            # Solid imports (the common case) skip this block entirely.
+            geometry_rebuilt = False
+            if num_vols == 0 and num_kps > 0:
+                geometry_rebuilt = True
                 print("\n⚠ Geometry needs reconstruction...")
                 
                 # Try to create areas from lines if needed
@@ -318,19 +446,13 @@ def import_cad_geometry(mapdl, file_path):
                         except:
                             pass
             
-            # Final check
-            num_kps = int(mapdl.get('_', 'KP', 0, 'COUNT'))
-            num_lines = int(mapdl.get('_', 'LINE', 0, 'COUNT'))
-            num_areas = int(mapdl.get('_', 'AREA', 0, 'COUNT'))
-            num_vols = int(mapdl.get('_', 'VOLU', 0, 'COUNT'))
+            # Final check (counts only change if the rebuild block ran)
+            if geometry_rebuilt:
+                num_kps, num_lines, num_areas, num_vols = count_entities(
+                    mapdl, 'KP', 'LINE', 'AREA', 'VOLU')
             
-            print("\n" + "-"*60)
-            print("FINAL GEOMETRY SUMMARY")
-            print("-"*60)
-            print(f"Keypoints: {num_kps}")
-            print(f"Lines: {num_lines}")
-            print(f"Areas: {num_areas}")
-            print(f"Volumes: {num_vols}")
+            print_banner("FINAL GEOMETRY SUMMARY", "-")
+            print_geometry_counts(num_kps, num_lines, num_areas, num_vols)
             
             if num_vols == 0 and num_areas == 0:
                 print("\n✗ ERROR: No usable geometry!")
@@ -356,22 +478,28 @@ def import_cad_geometry(mapdl, file_path):
             print("\n✓ Geometry ready for meshing!")
             return True
             
-        elif ext in ['.iges', '.igs']:
+        elif ext in IGES_EXTS:
             print("Format: IGES")
             
-            # Upload file to MAPDL working directory
+            # Upload file to MAPDL working directory, overlapping with AUX15 setup
             print("Uploading file to ANSYS working directory...")
-            mapdl.upload(file_path)
+            upload_pool = ThreadPoolExecutor(max_workers=1)
+            upload_future = upload_pool.submit(mapdl.upload, file_path)
             
             # Get just the filename (no path, WITH extension)
             filename_only = os.path.basename(file_path)
             
-            print(f"Importing '{filename_only}' from ANSYS directory...")
+            try:
+                with mapdl.non_interactive:
+                    mapdl.aux15()
+                    mapdl.ioptn('MERGE', 'YES')
+                    mapdl.ioptn('SOLID', 'YES')
+                    mapdl.ioptn('SMALL', 'YES')
+            finally:
+                upload_future.result() # Wait for upload before IGESIN
+                upload_pool.shutdown()
             
-            mapdl.aux15()
-            mapdl.ioptn('MERGE', 'YES')
-            mapdl.ioptn('SOLID', 'YES')
-            mapdl.ioptn('SMALL', 'YES')
+            print(f"Importing '{filename_only}' from ANSYS directory...")
             
             # Pass the full filename to the Python wrapper
             mapdl.igesin(filename_only)
@@ -383,27 +511,22 @@ def import_cad_geometry(mapdl, file_path):
             mapdl.nummrg('KP')  # Only merge keypoints
             
             try:
-                mapdl.vglue('ALL')
-                mapdl.aglue('ALL')
-                mapdl.lglue('ALL')
-            except:
-                pass
-            
-            num_kps = int(mapdl.get('_', 'KP', 0, 'COUNT'))
-            num_lines = int(mapdl.get('_', 'LINE', 0, 'COUNT'))
-            num_areas = int(mapdl.get('_', 'AREA', 0, 'COUNT'))
-            num_vols = int(mapdl.get('_', 'VOLU', 0, 'COUNT'))
+                with mapdl.non_interactive:
+                    mapdl.vglue('ALL')
+                    mapdl.aglue('ALL')
+                    mapdl.lglue('ALL')
+            except Exception as e:
+                print(f"  Glue skipped: {e}")
             
-            print("\n" + "-"*60)
-            print("GEOMETRY IMPORT SUMMARY")
-            print("-"*60)
-            print(f"Keypoints: {num_kps}")
-            print(f"Lines: {num_lines}")
-            print(f"Areas: {num_areas}")
-            print(f"Volumes: {num_vols}")
+            num_kps, num_lines, num_areas, num_vols = get_geometry_counts(mapdl)
+            
+            print_banner("GEOMETRY IMPORT SUMMARY", "-")
+            print_geometry_counts(num_kps, num_lines, num_areas, num_vols)
             
             # Try to rebuild if needed
-            if num_kps > 0 and num_vols == 0: # Check if we have *anything* but a volume
+            geometry_rebuilt = False
+            if num_vols == 0 and num_kps > 0: # Check if we have *anything* but a volume
+                geometry_rebuilt = True
                 
                 # Try to create areas from lines if needed
                 if num_areas == 0 and num_lines > 0:
@@ -428,9 +551,9 @@ def import_cad_geometry(mapdl, file_path):
                         print(f"Could not create volume: {e}")
 
             
-            # Final check on new numbers
-            num_vols = int(mapdl.get('_', 'VOLU', 0, 'COUNT'))
-            num_areas = int(mapdl.get('_', 'AREA', 0, 'COUNT'))
+            # Final check on new numbers (only re-query if the rebuild ran)
+            if geometry_rebuilt:
+                num_vols, num_areas = count_entities(mapdl, 'VOLU', 'AREA')
 
             if num_vols > 0 or num_areas > 0:
                 print(f"\n✓ Imported successfully!")
@@ -461,9 +584,7 @@ def import_cad_geometry(mapdl, file_path):
                 return False
             
         elif ext == '.sldprt':
-            print("\n" + "!"*60)
-            print("! SolidWorks File Detected")
-            print("!"*60)
+            print_banner("! SolidWorks File Detected", "!")
             print("\nSolidWorks .sldprt files cannot be directly imported.")
             print("\nPlease export to STEP or IGES format first.")
             print("!"*60)
@@ -479,26 +600,89 @@ def import_cad_geometry(mapdl, file_path):
         traceback.print_exc()
         return False
         
+def mesh_volumes(mapdl, element_type, esize):
+    """Mesh all volumes, reusing the current mesh if type and size match
+    
+    A new mesh invalidates the cached visualization grid.
+    """
+    key = (element_type, esize)
+    if _mesh_state['key'] == key:
+        print("✓ Reusing existing mesh (same element type and size)")
+        return
+    
+    if _mesh_state['key'] is not None:
+        mapdl.vclear('ALL')
+    mapdl.et(1, element_type)
+    mapdl.esize(esize)
+    mapdl.vmesh('ALL')
+    _mesh_state['key'] = key
+    _grid_cache['generation'] += 1
+
+
+def clear_mesh_cache():
+    """Forget the current mesh; call whenever the geometry is replaced"""
+    _mesh_state['key'] = None
+
+
+def get_mesh_grid(mapdl):
+    """Return mapdl.mesh.grid, transferring it only once per mesh"""
+    if _grid_cache['grid_generation'] != _grid_cache['generation']:
+        _grid_cache['grid'] = mapdl.mesh.grid
+        _grid_cache['grid_generation'] = _grid_cache['generation']
+    return _grid_cache['grid']
+
+
+def ask_element_size(mapdl):
+    """Prompt for the element size, defaulting to a size scaled to the part"""
+    bounds = get_many(mapdl, [('KP', 0, item, axis)
+                              for item in ('MNLOC', 'MXLOC') for axis in ('X', 'Y', 'Z')])
+    diag = float(np.linalg.norm(bounds[3:] - bounds[:3]))
+    default = diag / ESIZE_DIAG_DIVISOR
+    
+    answer = _ask(f"\nEnter element size (meters) [{default:.4g}]: ", 'esize')
+    return float(answer) if answer else default
+
+
+def assign_material(mapdl, material, labels):
+    """Define material 1 from the given MP labels in a single batch"""
+    with mapdl.non_interactive:
+        for label in labels:
+            mapdl.mp(label, 1, material[MP_KEYS[label]])
+
+
+def ask_areas(prompt, key):
+    """Prompt for one or more area numbers (e.g. '3' or '3, 5')"""
+    while True:
+        areas = [int(area) for area in re.findall(r'\d+', _ask(prompt, key))]
+        if areas:
+            return areas
+        if key in _config:
+            raise ValueError(f"Config entry '{key}' has no area numbers: {_config[key]!r}")
+        print("✗ Enter at least one area number")
+
+
+def apply_to_areas(mapdl, areas, command, *args):
+    """Select the areas and issue command('ALL', *args) in one batch"""
+    with mapdl.non_interactive:
+        mapdl.asel('S', 'AREA', '', areas[0])
+        for area in areas[1:]:
+            mapdl.asel('A', 'AREA', '', area)
+        command('ALL', *args)
+        mapdl.allsel()
+
+
 def static_structural_analysis(mapdl, material):
     """Perform static structural analysis"""
-    print("\n" + "="*60)
-    print("STATIC STRUCTURAL ANALYSIS")
-    print("="*60)
-    
-    # Set element type
-    mapdl.et(1, 'SOLID186')
+    print_banner("STATIC STRUCTURAL ANALYSIS")
     
     # Material properties
-    mapdl.mp('EX', 1, material['ex'])
-    mapdl.mp('NUXY', 1, material['nuxy'])
-    mapdl.mp('DENS', 1, material['dens'])
+    assign_material(mapdl, material, ('EX', 'NUXY', 'DENS'))
     
     # Mesh
-    esize = float(input("\nEnter element size (meters, e.g., 0.005): "))
-    mapdl.esize(esize)
+    esize = ask_element_size(mapdl)
     
     print("\nGenerating mesh...")
-    mapdl.vmesh('ALL')
+    mesh_volumes(mapdl, 'SOLID186', esize)
     
     # Check mesh
     num_nodes = mapdl.get('_', 'NODE', 0, 'COUNT')
@@ -512,33 +696,31 @@ def static_structural_analysis(mapdl, material):
         return None, None
     
     # Get available areas for boundary conditions
-    print("\n" + "-"*60)
-    print("AVAILABLE AREAS FOR BOUNDARY CONDITIONS:")
-    print("-"*60)
+    print_banner("AVAILABLE AREAS FOR BOUNDARY CONDITIONS:", "-")
     mapdl.alist()
     
     # Boundary conditions
     print("\nApplying boundary conditions...")
-    print("Fix one face (all DOF = 0)")
-    area_num = int(input("Enter area number to fix (from list above): "))
+    print("Fix one or more faces (all DOF = 0)")
+    fixed_areas = ask_areas("Enter area number(s) to fix (from list above): ", 'fix_area')
     
     try:
-        mapdl.da(area_num, 'ALL', 0)
-        print(f"✓ Fixed area {area_num}")
+        apply_to_areas(mapdl, fixed_areas, mapdl.da, 'ALL', 0)
+        print(f"✓ Fixed area(s) {fixed_areas}")
     except:
-        print(f"✗ ERROR: Could not fix area {area_num}")
+        print(f"✗ ERROR: Could not fix area(s) {fixed_areas}")
         return None, None
     
     # Apply force
-    print("\nApply force on a face")
-    force_area = int(input("Enter area number for force: "))
-    force_val = float(input("Enter force value (N): "))
+    print("\nApply force on one or more faces")
+    force_areas = ask_areas("Enter area number(s) for force: ", 'force_area')
+    force_val = float(_ask("Enter force value (N): ", 'force_val'))
     
     try:
-        mapdl.sfa(force_area, 1, 'PRES', force_val)
-        print(f"✓ Applied force on area {force_area}")
+        apply_to_areas(mapdl, force_areas, mapdl.sfa, 1, 'PRES', force_val)
+        print(f"✓ Applied force on area(s) {force_areas}")
     except:
-        print(f"✗ ERROR: Could not apply force to area {force_area}")
+        print(f"✗ ERROR: Could not apply force to area(s) {force_areas}")
         return None, None
     
     # Solve
@@ -560,48 +742,43 @@ def static_structural_analysis(mapdl, material):
 
 def modal_analysis(mapdl, material):
     """Perform modal analysis"""
-    print("\n" + "="*60)
-    print("MODAL ANALYSIS")
-    print("="*60)
-    
-    # Set element type
-    mapdl.et(1, 'SOLID186')
+    print_banner("MODAL ANALYSIS")
     
     # Material properties
-    mapdl.mp('EX', 1, material['ex'])
-    mapdl.mp('NUXY', 1, material['nuxy'])
-    mapdl.mp('DENS', 1, material['dens'])
+    assign_material(mapdl, material, ('EX', 'NUXY', 'DENS'))
     
     # Mesh
-    esize = float(input("\nEnter element size (meters, e.g., 0.005): "))
-    mapdl.esize(esize)
-    mapdl.vmesh('ALL')
+    esize = ask_element_size(mapdl)
+    mesh_volumes(mapdl, 'SOLID186', esize)
+    num_nodes = int(mapdl.get('_', 'NODE', 0, 'COUNT'))
     
     # Boundary conditions
     print("\nApplying boundary conditions...")
-    area_num = int(input("Enter area number to fix: "))
-    mapdl.da(area_num, 'ALL', 0)
+    fixed_areas = ask_areas("Enter area number(s) to fix: ", 'fix_area')
+    apply_to_areas(mapdl, fixed_areas, mapdl.da, 'ALL', 0)
     
     # Modal solve
-    num_modes = int(input("\nNumber of modes to extract (e.g., 10): "))
+    num_modes = int(_ask("\nNumber of modes to extract (e.g., 10): ", 'num_modes'))
     
     mapdl.finish()
     mapdl.slashsolu()
     mapdl.antype('MODAL')
-    mapdl.modopt('LANB', num_modes)
+    # Block Lanczos for small meshes, iterative PCG Lanczos for large ones
+    if num_nodes > LANPCG_NODE_THRESHOLD:
+        print(f"Large mesh ({num_nodes} nodes): using PCG Lanczos eigensolver")
+        mapdl.modopt('LANPCG', num_modes)
+    else:
+        mapdl.modopt('LANB', num_modes)
     mapdl.solve()
     mapdl.finish()
     
     # Post-process
     mapdl.post1()
     
-    print("\n" + "-"*60)
-    print("NATURAL FREQUENCIES")
-    print("-"*60)
-    for i in range(1, num_modes + 1):
-        mapdl.set(1, i)
-        freq = mapdl.get('_', 'MODE', '', 'FREQ')
-        print(f"Mode {i}: {freq:.2f} Hz")
+    print_banner("NATURAL FREQUENCIES", "-")
+    # All frequencies in one query instead of a SET + *GET round trip per mode
+    print("\n".join(f"Mode {i}: {freq:.2f} Hz"
+                    for i, freq in enumerate(mapdl.post_processing.frequency_values, 1)))
     
     mapdl.set(1, 1)  # Show first mode
     
@@ -610,35 +787,27 @@ def modal_analysis(mapdl, material):
 
 def thermal_analysis(mapdl, material):
     """Perform steady-state thermal analysis"""
-    print("\n" + "="*60)
-    print("THERMAL ANALYSIS")
-    print("="*60)
-    
-    # Set element type
-    mapdl.et(1, 'SOLID90')
+    print_banner("THERMAL ANALYSIS")
     
     # Material properties
-    mapdl.mp('KXX', 1, material['kxx'])
-    mapdl.mp('DENS', 1, material['dens'])
-    mapdl.mp('C', 1, material['c'])
+    assign_material(mapdl, material, ('KXX', 'DENS', 'C'))
     
     # Mesh
-    esize = float(input("\nEnter element size (meters, e.g., 0.005): "))
-    mapdl.esize(esize)
-    mapdl.vmesh('ALL')
+    esize = ask_element_size(mapdl)
+    mesh_volumes(mapdl, 'SOLID90', esize)
     
     # Boundary conditions
     print("\nApplying boundary conditions...")
     print("Fix temperature on one face")
-    temp_area = int(input("Enter area number for fixed temperature: "))
-    temp_val = float(input("Enter temperature value (°C): "))
-    mapdl.da(temp_area, 'TEMP', temp_val)
+    temp_areas = ask_areas("Enter area number(s) for fixed temperature: ", 'temp_area')
+    temp_val = float(_ask("Enter temperature value (°C): ", 'temp_val'))
+    apply_to_areas(mapdl, temp_areas, mapdl.da, 'TEMP', temp_val)
     
     # Apply heat flux
     print("\nApply heat flux on a face")
-    flux_area = int(input("Enter area number for heat flux: "))
-    flux_val = float(input("Enter heat flux value (W/m²): "))
-    mapdl.sfa(flux_area, 1, 'HFLUX', flux_val)
+    flux_areas = ask_areas("Enter area number(s) for heat flux: ", 'flux_area')
+    flux_val = float(_ask("Enter heat flux value (W/m²): ", 'flux_val'))
+    apply_to_areas(mapdl, flux_areas, mapdl.sfa, 1, 'HFLUX', flux_val)
     
     # Solve
     mapdl.finish()
@@ -656,26 +825,20 @@ def thermal_analysis(mapdl, material):
 
 def magnetostatic_analysis(mapdl, material):
     """Perform magnetostatic analysis"""
-    print("\n" + "="*60)
-    print("MAGNETOSTATIC ANALYSIS")
-    print("="*60)
-    
-    # Set element type
-    mapdl.et(1, 'SOLID236')
+    print_banner("MAGNETOSTATIC ANALYSIS")
     
     # Material properties
-    mapdl.mp('MURX', 1, material['murx'])
+    assign_material(mapdl, material, ('MURX',))
     
     # Mesh
-    esize = float(input("\nEnter element size (meters, e.g., 0.005): "))
-    mapdl.esize(esize)
-    mapdl.vmesh('ALL')
+    esize = ask_element_size(mapdl)
+    mesh_volumes(mapdl, 'SOLID236', esize)
     
     # Boundary conditions
     print("\nApplying boundary conditions...")
     print("Apply current density")
-    vol_num = int(input("Enter volume number for current: "))
-    current_dens = float(input("Enter current density (A/m²): "))
+    vol_num = int(_ask("Enter volume number for current: ", 'vol_num'))
+    current_dens = float(_ask("Enter current density (A/m²): ", 'current_dens'))
     mapdl.bfv(vol_num, 'JS', 1, current_dens)
     
     # Solve
@@ -692,17 +855,33 @@ def magnetostatic_analysis(mapdl, material):
     return 'b', 'Magnetic Flux Density (T)'
 
 
+def reset_model_for_rerun(mapdl):
+    """Drop the previous run's loads but keep the geometry
+    
+    The mesh is kept too; mesh_volumes() replaces it only if the next
+    analysis needs a different element type or size.
+    """
+    mapdl.finish()
+    mapdl.prep7()
+    mapdl.lsclear('ALL')  # Loads and boundary conditions
+
+
 def visualize_results(mapdl, result_type, title):
     """Visualize analysis results"""
     print("\nPreparing visualization...")
     
     try:
-        # Get mesh grid
-        grid = mapdl.mesh.grid
+        # Plotting stack is imported on first use to keep startup fast
+        import pyvista as pv
+        from ansys.mapdl.core.plotting.theme import PyMAPDL_cmap
+        
+        # Get mesh grid (cached until the next remesh)
+        grid = get_mesh_grid(mapdl)
         
         # Get result values based on type
         if result_type == 'stress':
-            scalars = mapdl.post_processing.nodal_eqv_stress()
+            # Single *VGET of APDL's own S,EQV result
+            scalars = mapdl.post_processing.nodal_values('s', 'eqv')
         elif result_type == 'disp':
             scalars = mapdl.post_processing.nodal_displacement('NORM')
         elif result_type == 'temp':
@@ -712,6 +891,9 @@ def visualize_results(mapdl, result_type, title):
         else:
             scalars = mapdl.post_processing.nodal_displacement('NORM')
         
+        # Plotting only needs single precision; halves the array VTK copies
+        scalars = np.asarray(scalars, dtype=np.float32)
+        
         # Create plot
         plotter = pv.Plotter(window_size=[1400, 900])
         
@@ -766,12 +948,45 @@ def find_ansys_executable():
     return None
 
 
+def default_nproc(exec_file):
+    """Number of cores to solve on, capped at the license limit"""
+    license_cap = 4 if 'Student' in exec_file else 8
+    return max(1, min(os.cpu_count() or 1, license_cap))
+
+
+# Menu choice -> analysis function returning (result_type, title)
+ANALYSIS_DISPATCH = {
+    '1': static_structural_analysis,
+    '2': modal_analysis,
+    '3': thermal_analysis,
+    '5': magnetostatic_analysis,
+}
+
+# Menu entries without an implementation yet, with the note shown instead
+PENDING_ANALYSES = {
+    '4': ("\nThermal-Structural analysis combines thermal and structural.\n"
+          "Run thermal analysis first, then apply thermal loads to structural."),
+    '6': "\nHarmonic analysis coming soon!",
+}
+
+
 def main():
     """Main function"""
-    
-    print("\n" + "="*60)
-    print("ANSYS MAPDL ANALYSIS TOOL - STARTING...")
-    print("="*60)
+    global VERBOSE
+    
+    parser = argparse.ArgumentParser(description="ANSYS MAPDL analysis with CAD import")
+    parser.add_argument('--config',
+                        help="JSON/YAML file answering the prompts for a scripted run")
+    parser.add_argument('--verbose', action='store_true',
+                        help="Query and print all geometry entity counts after import")
+    parser.add_argument('--nproc', type=int,
+                        help="Cores for the MAPDL solver (default: all, up to the license cap)")
+    args = parser.parse_args()
+    VERBOSE = args.verbose
+    if args.config:
+        _config.update(load_config(args.config))
+    
+    print_banner("ANSYS MAPDL ANALYSIS TOOL - STARTING...")
     
     # Find ANSYS executable
     print("\nSearching for ANSYS installation...")
@@ -781,10 +996,10 @@ def main():
         print(f"✓ Found ANSYS at: {exec_file}")
     else:
         print("✗ Could not find ANSYS automatically.")
-        exec_file = input("Enter full path to ANSYS executable: ").strip().strip('"')
+        exec_file = _ask("Enter full path to ANSYS executable: ", 'ansys_exe').strip('"')
         if not os.path.exists(exec_file):
             print("ERROR: ANSYS executable not found!")
-            input("\nPress Enter to exit...")
+            _pause("\nPress Enter to exit...")
             return
     
     # Launch MAPDL
@@ -798,7 +1013,11 @@ def main():
             os.makedirs(ansys_work_dir)
         print(f"✓ Setting ANSYS working directory to: {ansys_work_dir}")
         
-        mapdl = launch_mapdl(exec_file=exec_file, run_location=ansys_work_dir)
+        nproc = args.nproc or default_nproc(exec_file)
+        print(f"✓ Using {nproc} core(s) for the solver")
+        
+        mapdl = launch_mapdl(exec_file=exec_file, run_location=ansys_work_dir,
+                             nproc=nproc, additional_switches='-smp')
         print("\n✓ ANSYS MAPDL launched successfully!")
     except Exception as e:
         print(f"\n✗ ERROR launching MAPDL: {e}")
@@ -809,78 +1028,86 @@ def main():
         print("2. Check if ANSYS license is available")
         print("3. Try closing any running ANSYS instances")
         print("4. Run PowerShell as Administrator")
-        input("\nPress Enter to exit...")
+        _pause("\nPress Enter to exit...")
         return
     
     try:
+        first_pass = True
+        loaded_geometry = None
         while True:
+            # A config-driven run performs exactly one analysis pass
+            if _config and not first_pass:
+                break
+            first_pass = False
+            
             display_menu()
-            choice = input("\nEnter your choice (0-6): ").strip()
+            choice = _ask("\nEnter your choice (0-6): ", 'analysis')
             
             if choice == '0':
                 print("\nExiting...")
                 break
             
-            if choice not in ['1', '2', '3', '4', '5', '6']:
-                print("Invalid choice. Please try again.")
+            if choice in PENDING_ANALYSES:
+                print(PENDING_ANALYSES[choice])
+                _pause("\nPress Enter to continue...")
                 continue
             
-            # Clear and start fresh
-            mapdl.clear()
-            mapdl.prep7()
-            
-            # --- MODIFIED LOGIC HERE ---
-            # Get CAD file path or 'cube' command
-            file_path = get_file_path()
-            if not file_path:
+            analysis_fn = ANALYSIS_DISPATCH.get(choice)
+            if analysis_fn is None:
+                print("Invalid choice. Please try again.")
                 continue
             
-            # Handle geometry creation
-            geometry_success = False
-            if file_path == 'CREATE_CUBE':
-                print("\nAttempting to create built-in cube...")
-                if create_cube_geometry(mapdl):
-                    geometry_success = True
-                else:
-                    print("\n✗ ERROR: Failed to create test cube.")
+            # Offer to reuse the geometry loaded by the previous run
+            reuse_geometry = False
+            if loaded_geometry:
+                answer = _ask(f"\nReuse loaded geometry ({loaded_geometry})? [Y/n]: ", 'reuse_geometry')
+                reuse_geometry = answer.lower() not in ('n', 'no')
+            
+            if reuse_geometry:
+                reset_model_for_rerun(mapdl)
+                print(f"✓ Reusing geometry: {loaded_geometry}")
             else:
-                # It's a file path, try to import it
-                if import_cad_geometry(mapdl, file_path):
-                    geometry_success = True
-            
-            # If geometry failed, loop back to main menu
-            if not geometry_success:
-                print("\n✗ ERROR: Geometry import or creation failed.")
-                print("Please check your file or try the 'cube' option.")
-                input("\nPress Enter to continue...")
-                continue
-            # --- END OF MODIFIED LOGIC ---
+                # Clear and start fresh
+                loaded_geometry = None
+                mapdl.clear()
+                clear_mesh_cache()
+                mapdl.prep7()
+                
+                # --- MODIFIED LOGIC HERE ---
+                # Get CAD file path or 'cube' command
+                file_path, ext = get_file_path()
+                if not file_path:
+                    continue
+                
+                # Handle geometry creation
+                geometry_success = False
+                if file_path == 'CREATE_CUBE':
+                    print("\nAttempting to create built-in cube...")
+                    if create_cube_geometry(mapdl):
+                        geometry_success = True
+                    else:
+                        print("\n✗ ERROR: Failed to create test cube.")
+                else:
+                    # It's a file path, try to import it
+                    if import_cad_geometry(mapdl, file_path, ext):
+                        geometry_success = True
+                
+                # If geometry failed, loop back to main menu
+                if not geometry_success:
+                    print("\n✗ ERROR: Geometry import or creation failed.")
+                    print("Please check your file or try the 'cube' option.")
+                    _pause("\nPress Enter to continue...")
+                    continue
+                
+                loaded_geometry = 'test cube' if file_path == 'CREATE_CUBE' else os.path.basename(file_path)
+                # --- END OF MODIFIED LOGIC ---
 
             # Get material properties
             material = get_material_properties()
             
             # Perform selected analysis
             try:
-                result_type = None
-                title = None
-                
-                if choice == '1':
-                    result_type, title = static_structural_analysis(mapdl, material)
-                elif choice == '2':
-                    result_type, title = modal_analysis(mapdl, material)
-                elif choice == '3':
-                    result_type, title = thermal_analysis(mapdl, material)
-                elif choice == '4':
-                    print("\nThermal-Structural analysis combines thermal and structural.")
-                    print("Run thermal analysis first, then apply thermal loads to structural.")
-                    input("\nPress Enter to continue...")
-                    continue
-                elif choice == '5':
-                    result_type, title = magnetostatic_analysis(mapdl, material)
-                elif choice == '6':
-                    print("\nHarmonic analysis coming soon!")
-                    input("\nPress Enter to continue...")
-                    continue
+                result_type, title = analysis_fn(mapdl, material)
                 
                 # Visualize results
                 if result_type and title:
@@ -895,7 +1122,7 @@ def main():
                 traceback.print_exc()
                 print("Please check your inputs and try again.")
             
-            input("\nPress Enter to return to main menu...")
+            _pause("\nPress Enter to return to main menu...")
     
     except KeyboardInterrupt:
         print("\n\nInterrupted by user.")
@@ -911,7 +1138,7 @@ def main():
         except:
             pass
         
-        input("\nPress Enter to exit...")
+        _pause("\nPress Enter to exit...")
 
 if __name__ == "__main__":
 
@@ -925,7 +1152,7 @@ if __name__ == "__main__":
 
         traceback.print_exc()
 
-        input("\nPress Enter to exit...")
+        _pause("\nPress Enter to exit...")
 
     finally:
 
@@ -82,6 +82,91 @@ RULES:
 - Do NOT include code blocks with backticks
 - Return ONLY the JSON object`;
 
+/**
+ * Outermost {...} of a model reply. Drops markdown code fences and any prose
+ * around the object with two index scans instead of two regex passes.
+ */
+function extractJsonObject(text: string): string {
+    const start = text.indexOf('{');
+    const end = text.lastIndexOf('}');
+    return start !== -1 && end > start ? text.slice(start, end + 1) : text.trim();
+}
+
+// Gemini downsamples large images anyway, so larger uploads only cost bandwidth
+const MAX_UPLOAD_DIMENSION = 768;
+const UPLOAD_JPEG_QUALITY = 0.8;
+
+/**
+ * Downscale an image to fit MAX_UPLOAD_DIMENSION and re-encode it as JPEG.
+ * Keeps the original file if it cannot be decoded or the result is not smaller.
+ */
+async function shrinkImageForUpload(imageFile: File): Promise<Blob> {
+    try {
+        const bitmap = await createImageBitmap(imageFile);
+        const scale = Math.min(1, MAX_UPLOAD_DIMENSION / Math.max(bitmap.width, bitmap.height));
+        const canvas = document.createElement('canvas');
+        canvas.width = Math.round(bitmap.width * scale);
+        canvas.height = Math.round(bitmap.height * scale);
+
+        const ctx = canvas.getContext('2d');
+        if (!ctx) {
+            bitmap.close();
+            return imageFile;
+        }
+        // JPEG has no alpha channel; flatten transparent PNGs onto white instead of black
+        ctx.fillStyle = '#ffffff';
+        ctx.fillRect(0, 0, canvas.width, canvas.height);
+        ctx.drawImage(bitmap, 0, 0, canvas.width, canvas.height);
+        bitmap.close();
+
+        const jpeg = await new Promise<Blob | null>((resolve) =>
+            canvas.toBlob(resolve, 'image/jpeg', UPLOAD_JPEG_QUALITY)
+        );
+        return jpeg && jpeg.size < imageFile.size ? jpeg : imageFile;
+    } catch {
+        return imageFile;
+    }
+}
+
+const CACHE_PREFIX = 'gemini-cache:';
+
+/**
+ * Exact-match cache key: SHA-256 of the prompt followed by the attached file bytes.
+ * Returns null where Web Crypto is unavailable (non-secure context), disabling the cache.
+ */
+async function getCacheKey(prompt: string, file?: Blob): Promise<string | null> {
+    if (!globalThis.crypto?.subtle) {
+        return null;
+    }
+    const bytes = await new Blob(file ? [prompt, file] : [prompt]).arrayBuffer();
+    const digest = await crypto.subtle.digest('SHA-256', bytes);
+    const hex = Array.from(new Uint8Array(digest), (b) => b.toString(16).padStart(2, '0')).join('');
+    return CACHE_PREFIX + hex;
+}
+
+function readCachedResponse(key: string | null): GeminiAnalysisResponse | null {
+    if (!key) {
+        return null;
+    }
+    try {
+        const cached = localStorage.getItem(key);
+        return cached ? (JSON.parse(cached) as GeminiAnalysisResponse) : null;
+    } catch {
+        return null;
+    }
+}
+
+function writeCachedResponse(key: string | null, value: GeminiAnalysisResponse): void {
+    if (!key) {
+        return;
+    }
+    try {
+        localStorage.setItem(key, JSON.stringify(value));
+    } catch {
+        // Storage full or disabled - the response is simply not cached
+    }
+}
+
 export async function getAnalysisRecommendation(
     userDescription: string,
     fileName?: string
@@ -100,6 +185,14 @@ User description: "${userDescription}"
 
 Respond with ONLY the JSON object, no other text.`;
 
+    // Identical prompts return the stored validated response without an API call
+    const cacheKey = await getCacheKey(fullPrompt);
+    const cached = readCachedResponse(cacheKey);
+    if (cached) {
+        console.log('Gemini response served from cache (text)');
+        return cached;
+    }
+
     try {
         const response = await fetch(
             `https://generativelanguage.googleapis.com/v1/models/gemini-2.5-flash:generateContent?key=${apiKey}`,
@@ -166,21 +259,7 @@ Respond with ONLY the JSON object, no other text.`;
 
         // Parse JSON response - with responseMimeType set to application/json, it should be direct JSON
         try {
-            // Clean the response string
-            let jsonString = geminiResponse.trim();
-
-            // Remove markdown code blocks if present (fallback for older API versions)
-            const codeBlockMatch = jsonString.match(/```(?:json)?\s*(\{[\s\S]*?\})\s*```/);
-            if (codeBlockMatch) {
-                jsonString = codeBlockMatch[1].trim();
-            }
-
-            // Remove any leading/trailing non-JSON characters
-            const jsonMatch = jsonString.match(/(\{[\s\S]*\})/);
-            if (jsonMatch) {
-                jsonString = jsonMatch[1];
-            }
-
+            const jsonString = extractJsonObject(geminiResponse);
             const parsedResponse: GeminiAnalysisResponse = JSON.parse(jsonString);
 
             // Validate response structure
@@ -214,6 +293,7 @@ Respond with ONLY the JSON object, no other text.`;
                 }
             });
 
+            writeCachedResponse(cacheKey, parsedResponse);
             return parsedResponse;
         } catch (parseError) {
             console.error('Error parsing Gemini JSON:', parseError);
@@ -236,19 +316,6 @@ export async function getAnalysisRecommendationWithImage(
         throw new Error('Gemini API key not configured');
     }
 
-    // Convert image to base64
-    const base64Image = await new Promise<string>((resolve, reject) => {
-        const reader = new FileReader();
-        reader.onloadend = () => {
-            const base64 = reader.result as string;
-            // Remove data URL prefix
-            const base64Data = base64.split(',')[1];
-            resolve(base64Data);
-        };
-        reader.onerror = reject;
-        reader.readAsDataURL(imageFile);
-    });
-
     const fullPrompt = `${ANALYSIS_INSTRUCTION}
 
 Image file: ${imageFile.name}
@@ -257,6 +324,28 @@ User description: "${userDescription}"
 
 Respond with ONLY the JSON object, no other text.`;
 
+    // Same prompt and same image bytes: skip both the base64 encode and the API call
+    const cacheKey = await getCacheKey(fullPrompt, imageFile);
+    const cached = readCachedResponse(cacheKey);
+    if (cached) {
+        console.log('Gemini response served from cache (image)');
+        return cached;
+    }
+
+    const uploadImage = await shrinkImageForUpload(imageFile);
+
+    // Convert image to base64
+    const base64Image = await new Promise<string>((resolve, reject) => {
+        const reader = new FileReader();
+        reader.onloadend = () => {
+            const dataUrl = reader.result as string;
+            // Drop the "data:<mime>;base64," prefix with one slice instead of split()
+            resolve(dataUrl.slice(dataUrl.indexOf(',') + 1));
+        };
+        reader.onerror = reject;
+        reader.readAsDataURL(uploadImage);
+    });
+
     try {
         const response = await fetch(
             `https://generativelanguage.googleapis.com/v1/models/gemini-2.5-flash:generateContent?key=${apiKey}`,
@@ -269,7 +358,7 @@ Respond with ONLY the JSON object, no other text.`;
                             { text: fullPrompt },
                             {
                                 inline_data: {
-                                    mime_type: imageFile.type,
+                                    mime_type: uploadImage.type || imageFile.type,
                                     data: base64Image
                                 }
                             }
@@ -333,20 +422,7 @@ Respond with ONLY the JSON object, no other text.`;
 
         // Parse JSON response with same robust parsing as text-only function
         try {
-            let jsonString = geminiResponse.trim();
-
-            // Remove markdown code blocks if present
-            const codeBlockMatch = jsonString.match(/```(?:json)?\s*(\{[\s\S]*?\})\s*```/);
-            if (codeBlockMatch) {
-                jsonString = codeBlockMatch[1].trim();
-            }
-
-            // Remove any leading/trailing non-JSON characters
-            const jsonMatch = jsonString.match(/(\{[\s\S]*\})/);
-            if (jsonMatch) {
-                jsonString = jsonMatch[1];
-            }
-
+            const jsonString = extractJsonObject(geminiResponse);
             const parsedResponse: GeminiAnalysisResponse = JSON.parse(jsonString);
 
             // Validate response structure
@@ -380,6 +456,7 @@ Respond with ONLY the JSON object, no other text.`;
                 }
             });
 
+            writeCachedResponse(cacheKey, parsedResponse);
             return parsedResponse;
         } catch (parseError) {
             console.error('Error parsing Gemini JSON:', parseError);
@@ -1,24 +1,159 @@
 import cv2
 import numpy as np
-import matplotlib.pyplot as plt
 import pytesseract
 from google.colab import files
+from IPython.display import Image as DisplayImage, display
 import re
 import json
 import os
+import hashlib
+import threading
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Tuple, Any, Optional
 
+# tesserocr keeps the Tesseract model loaded in-process; pytesseract starts a
+# new tesseract process (and reloads the language data) on every call
+try:
+    from tesserocr import PyTessBaseAPI, PSM
+    from PIL import Image
+except ImportError:
+    PyTessBaseAPI = None
+
+# orjson serializes the exported structure much faster than the json module
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# OCR text of recently seen images, keyed on a hash of their pixels, so
+# re-running a view in the same session skips Tesseract
+_OCR_CACHE_SIZE = 128
+_ocr_cache = OrderedDict()
+_ocr_cache_lock = threading.Lock()
+
+# Third OCR pass: tell Tesseract the scan resolution and treat the view as one
+# text block, instead of OCRing a 2x enlarged copy of the image
+OCR_DPI_CONFIG = '--dpi 150 --psm 6'
+
+# Margin (px) kept around the inked area when cropping a view for OCR
+OCR_CROP_PADDING = 20
+
+# Preprocess on the GPU when OpenCV was built with CUDA and a device is present
+USE_CUDA = hasattr(cv2, 'cuda') and cv2.cuda.getCudaEnabledDeviceCount() > 0
+
+# cv2.ximgproc (opencv-contrib) has a line segment detector that is much faster
+# than probabilistic Hough on drawings; fall back to HoughLinesP without it
+HAS_FAST_LINE_DETECTOR = hasattr(cv2, 'ximgproc') and hasattr(cv2.ximgproc, 'createFastLineDetector')
+
+# Dimension names of the first two values read from each view
+_VIEW_KEYS = {
+    'TOP_VIEW': ('width', 'depth'),
+    'FRONT_VIEW': ('width', 'height'),
+    'SIDE_VIEW': ('depth', 'height'),
+}
+
+# Views that show each overall dimension, the preferred one first
+_DIMENSION_VIEWS = {
+    'width': ('TOP_VIEW', 'FRONT_VIEW'),
+    'height': ('FRONT_VIEW', 'SIDE_VIEW'),
+    'depth': ('TOP_VIEW', 'SIDE_VIEW'),
+}
+
+# Common dimension formats (e.g., "100 mm", "100mm", "100")
+_DIMENSION_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*(?:mm|cm|m)?', re.IGNORECASE)
+
+# OCR passes run on these long-lived threads, each holding its own tesserocr
+# API per config (the API is not thread-safe)
+_ocr_executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix='ocr')
+_ocr_thread = threading.local()
+
+# Views are processed on these long-lived threads, so each thread's CLAHE
+# object, line detector and gray/binary buffers are reused across views,
+# calls and extractors
+_view_executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix='view')
+_view_thread = threading.local()
+
+def _image_to_string(image, config: str = '') -> str:
+    """OCR an image with tesserocr if available, else pytesseract."""
+    if PyTessBaseAPI is None:
+        return pytesseract.image_to_string(image, config=config)
+    
+    apis = getattr(_ocr_thread, 'apis', None)
+    if apis is None:
+        apis = _ocr_thread.apis = {}
+    if config not in apis:
+        if config == OCR_DPI_CONFIG:
+            apis[config] = PyTessBaseAPI(psm=PSM.SINGLE_BLOCK,
+                                         variables={'user_defined_dpi': '150'})
+        else:
+            apis[config] = PyTessBaseAPI(psm=PSM.AUTO)
+    
+    api = apis[config]
+    api.SetImage(Image.fromarray(image))
+    return api.GetUTF8Text()
+
+def _ocr_cached(image, config: str = '') -> str:
+    """OCR an image, reusing the result for identical images."""
+    digest = hashlib.blake2b(image.tobytes(), digest_size=16)
+    digest.update(f"{image.shape}{config}".encode())
+    key = digest.digest()
+    
+    with _ocr_cache_lock:
+        if key in _ocr_cache:
+            _ocr_cache.move_to_end(key)
+            return _ocr_cache[key]
+    
+    text = _image_to_string(image, config)
+    with _ocr_cache_lock:
+        _ocr_cache[key] = text
+        if len(_ocr_cache) > _OCR_CACHE_SIZE:
+            _ocr_cache.popitem(last=False)
+    return text
+
+def _merge_ocr_values(passes: List[List[float]]) -> List[float]:
+    """
+    Merge the values read by several OCR passes of the same image.
+    
+    Passes are combined as a multiset: each value (rounded to 3 decimals)
+    appears as often as the pass that read it most often, so repeated
+    readings across passes collapse but equal dimensions within a pass
+    (e.g. "50 50" on a square face) are kept. Values come out in the order
+    they were first read.
+    """
+    counts = Counter()
+    for values in passes:
+        counts |= Counter(round(value, 3) for value in values)
+    
+    merged = []
+    emitted = Counter()
+    for values in passes:
+        for value in values:
+            key = round(value, 3)
+            if emitted[key] < counts[key]:
+                emitted[key] += 1
+                merged.append(value)
+    return merged
+
 class DimensionExtractor:
     """
     Extract dimensions from cropped engineering drawing views and
     establish relationships between dimensions across views.
     """
     
-    def __init__(self):
-        """Initialize the extractor."""
+    def __init__(self, display: bool = True):
+        """
+        Initialize the extractor.
+        
+        Args:
+            display: Show each view with its detected dimensions (turn off
+                for headless or batch runs)
+        """
+        self.display = display
         self.views = {}
         self.dimensions = {}
         self.matched_dimensions = {}
+        self._lock = threading.Lock()
         
     def upload_views(self):
         """Upload cropped view images in Google Colab."""
@@ -32,12 +167,10 @@ class DimensionExtractor:
             # Determine view type from filename
             view_type = self._determine_view_type(filename)
             
-            # Decode image
-            image = cv2.imdecode(np.frombuffer(content, np.uint8), cv2.IMREAD_COLOR)
-            
-            # Store view
+            # Store the encoded file; it is decoded only while the view is
+            # being processed
             self.views[view_type] = {
-                'image': image,
+                'bytes': content,
                 'filename': filename
             }
             
@@ -45,6 +178,10 @@ class DimensionExtractor:
         
         return self.views
     
+    def _get_image(self, view_type: str):
+        """Decode the stored image of a view."""
+        return cv2.imdecode(np.frombuffer(self.views[view_type]['bytes'], np.uint8), cv2.IMREAD_COLOR)
+    
     def _determine_view_type(self, filename: str) -> str:
         """Determine view type from filename."""
         filename = filename.lower()
@@ -73,24 +210,52 @@ class DimensionExtractor:
     
     def preprocess_image(self, image):
         """Preprocess image for better text detection."""
+        if USE_CUDA:
+            return self._preprocess_image_cuda(image)
+        
+        # Reuse this thread's gray/binary buffers while the view size is unchanged
+        buffers = getattr(_view_thread, 'buffers', None)
+        if buffers is None or buffers.shape[1:] != image.shape[:2]:
+            buffers = _view_thread.buffers = np.empty((2,) + image.shape[:2], dtype=np.uint8)
+        gray, binary = buffers[0], buffers[1]
+        
         # Convert to grayscale
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        cv2.cvtColor(image, cv2.COLOR_BGR2GRAY, dst=gray)
         
         # Increase contrast
-        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
-        gray = clahe.apply(gray)
+        clahe = getattr(_view_thread, 'clahe', None)
+        if clahe is None:
+            clahe = _view_thread.clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
+        clahe.apply(gray, gray)
         
         # Apply binary threshold
-        _, binary = cv2.threshold(gray, 180, 255, cv2.THRESH_BINARY_INV)
+        cv2.threshold(gray, 180, 255, cv2.THRESH_BINARY_INV, dst=binary)
         
         return gray, binary
     
-    def extract_dimensions_from_view(self, view_type: str) -> Dict[str, float]:
+    def _preprocess_image_cuda(self, image):
+        """Same steps as preprocess_image, run with cv2.cuda."""
+        gpu_image = cv2.cuda_GpuMat()
+        gpu_image.upload(image)
+        gpu_gray = cv2.cuda.cvtColor(gpu_image, cv2.COLOR_BGR2GRAY)
+        
+        clahe = getattr(_view_thread, 'cuda_clahe', None)
+        if clahe is None:
+            clahe = _view_thread.cuda_clahe = cv2.cuda.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
+        gpu_gray = clahe.apply(gpu_gray, cv2.cuda_Stream.Null())
+        
+        _, gpu_binary = cv2.cuda.threshold(gpu_gray, 180, 255, cv2.THRESH_BINARY_INV)
+        
+        # OCR and line detection run on the CPU
+        return gpu_gray.download(), gpu_binary.download()
+    
+    def extract_dimensions_from_view(self, view_type: str, display: Optional[bool] = None) -> Dict[str, float]:
         """
         Extract dimensions from a single view using OCR and dimension line detection.
         
         Args:
             view_type: The type of view (TOP_VIEW, FRONT_VIEW, SIDE_VIEW)
+            display: Override self.display for this view
             
         Returns:
             Dictionary of dimension names and values
@@ -99,81 +264,63 @@ class DimensionExtractor:
             print(f"View {view_type} not found")
             return {}
         
-        view_image = self.views[view_type]['image']
+        view_image = self._get_image(view_type)
         gray, binary = self.preprocess_image(view_image)
         
         # Extract text using OCR
         extracted_dimensions = {}
         
-        # First try on the normal image with low threshold
-        text_normal = pytesseract.image_to_string(gray)
-        dimensions_normal = self._parse_dimensions_from_text(text_normal)
-        
-        # Try also on the binary image
-        text_binary = pytesseract.image_to_string(binary)
-        dimensions_binary = self._parse_dimensions_from_text(text_binary)
-        
-        # Try with different preprocessing
-        # Resize for better OCR
-        resized = cv2.resize(gray, None, fx=2, fy=2, interpolation=cv2.INTER_CUBIC)
-        text_resized = pytesseract.image_to_string(resized)
-        dimensions_resized = self._parse_dimensions_from_text(text_resized)
-        
-        # Combine results from different methods
-        all_dimensions = {**dimensions_normal, **dimensions_binary, **dimensions_resized}
-        
-        # If dimensions were found through OCR
-        if all_dimensions:
-            # Map dimensions to appropriate names based on view type
-            if view_type == 'TOP_VIEW':
-                if len(all_dimensions) >= 2:
-                    # Try to determine which is width and which is depth
-                    dim_keys = list(all_dimensions.keys())
-                    extracted_dimensions['width'] = all_dimensions[dim_keys[0]]
-                    extracted_dimensions['depth'] = all_dimensions[dim_keys[1]]
-                    
-                    # If there are more dimensions, add them as extras
-                    for i, key in enumerate(dim_keys[2:], start=1):
-                        extracted_dimensions[f'extra_{i}'] = all_dimensions[key]
-                else:
-                    # Just copy over whatever was found
-                    extracted_dimensions = all_dimensions
-            
-            elif view_type == 'FRONT_VIEW':
-                if len(all_dimensions) >= 2:
-                    dim_keys = list(all_dimensions.keys())
-                    extracted_dimensions['width'] = all_dimensions[dim_keys[0]]
-                    extracted_dimensions['height'] = all_dimensions[dim_keys[1]]
-                    
-                    for i, key in enumerate(dim_keys[2:], start=1):
-                        extracted_dimensions[f'extra_{i}'] = all_dimensions[key]
-                else:
-                    extracted_dimensions = all_dimensions
-            
-            elif view_type == 'SIDE_VIEW':
-                if len(all_dimensions) >= 2:
-                    dim_keys = list(all_dimensions.keys())
-                    extracted_dimensions['depth'] = all_dimensions[dim_keys[0]]
-                    extracted_dimensions['height'] = all_dimensions[dim_keys[1]]
-                    
-                    for i, key in enumerate(dim_keys[2:], start=1):
-                        extracted_dimensions[f'extra_{i}'] = all_dimensions[key]
-                else:
-                    extracted_dimensions = all_dimensions
+        # Only OCR the region that has ink in it, plus a margin
+        x, y, w, h = cv2.boundingRect(binary)
+        x0, y0 = max(x - OCR_CROP_PADDING, 0), max(y - OCR_CROP_PADDING, 0)
+        x1, y1 = x + w + OCR_CROP_PADDING, y + h + OCR_CROP_PADDING
+        gray_roi, binary_roi = gray[y0:y1, x0:x1], binary[y0:y1, x0:x1]
+        
+        # OCR the normal image, the binary image and the normal image again
+        # with Tesseract's own scaling. Tesseract releases the GIL, so the
+        # passes run in parallel
+        texts = []
+        if w and h:
+            ocr_inputs = [(gray_roi, ''), (binary_roi, ''), (gray_roi, OCR_DPI_CONFIG)]
+            texts = list(_ocr_executor.map(_ocr_cached, *zip(*ocr_inputs)))
+        
+        # Combine results from different methods without letting one pass
+        # overwrite another's readings
+        ordered = _merge_ocr_values(
+            [list(self._parse_dimensions_from_text(text).values()) for text in texts]
+        )
+        all_dimensions = {f'dim_{i+1}': value for i, value in enumerate(ordered)}
+        
+        # If dimensions were found through OCR, map them to appropriate names
+        # based on view type
+        view_keys = _VIEW_KEYS.get(view_type)
+        if all_dimensions and view_keys:
+            if len(ordered) >= 2:
+                # The first two values are the view's two principal dimensions
+                extracted_dimensions = dict(zip(view_keys, ordered))
+                
+                # If there are more dimensions, add them as extras
+                for i, value in enumerate(ordered[2:], start=1):
+                    extracted_dimensions[f'extra_{i}'] = value
+            else:
+                # Just copy over whatever was found
+                extracted_dimensions = all_dimensions
         
         # Find dimension lines to associate with values
         dimension_lines = self._detect_dimension_lines(binary)
         
         # Store the results
-        self.dimensions[view_type] = {
-            'extracted': extracted_dimensions,
-            'dimension_lines': dimension_lines
-        }
+        with self._lock:
+            self.dimensions[view_type] = {
+                'extracted': extracted_dimensions,
+                'dimension_lines': dimension_lines
+            }
         
         print(f"Extracted dimensions from {view_type}: {extracted_dimensions}")
         
         # Display image with highlighted dimension lines
-        self._display_view_with_dimensions(view_type, extracted_dimensions, dimension_lines)
+        if self.display if display is None else display:
+            self._display_view_with_dimensions(view_type, extracted_dimensions, dimension_lines, view_image)
         
         return extracted_dimensions
     
@@ -187,22 +334,12 @@ class DimensionExtractor:
         Returns:
             Dictionary of dimension positions and values
         """
-        # Pattern to match common dimension formats (e.g., "100 mm", "100mm", "100")
-        dimension_pattern = re.compile(r'(\d+(?:\.\d+)?)\s*(?:mm|cm|m)?', re.IGNORECASE)
-        matches = dimension_pattern.findall(text)
-        
-        # Convert to float and map to positions
-        dimensions = {}
-        for i, match in enumerate(matches):
-            if match:
-                try:
-                    value = float(match)
-                    # Use dimension index as key initially
-                    dimensions[f'dim_{i+1}'] = value
-                except ValueError:
-                    pass
-        
-        return dimensions
+        matches = _DIMENSION_PATTERN.findall(text)
+        
+        # Convert to float in one go (every match is a valid number) and use
+        # the dimension index as key initially
+        values = np.array(matches, dtype=np.float64).tolist()
+        return {f'dim_{i+1}': value for i, value in enumerate(values)}
     
     def _detect_dimension_lines(self, binary_image):
         """
@@ -214,43 +351,57 @@ class DimensionExtractor:
         Returns:
             List of detected dimension lines
         """
-        # Find lines using Hough transform
-        lines = cv2.HoughLinesP(
-            binary_image, 
-            rho=1, 
-            theta=np.pi/180, 
-            threshold=50, 
-            minLineLength=20, 
-            maxLineGap=10
-        )
+        if HAS_FAST_LINE_DETECTOR:
+            # Find line segments with the fast line detector
+            fld = getattr(_view_thread, 'fld', None)
+            if fld is None:
+                fld = _view_thread.fld = cv2.ximgproc.createFastLineDetector(
+                    length_threshold=20,
+                    distance_threshold=1.414
+                )
+            lines = fld.detect(binary_image)
+        else:
+            # Find lines using Hough transform
+            lines = cv2.HoughLinesP(
+                binary_image, 
+                rho=1, 
+                theta=np.pi/180, 
+                threshold=50, 
+                minLineLength=20, 
+                maxLineGap=10
+            )
         
-        dimension_lines = []
-        if lines is not None:
-            for line in lines:
-                x1, y1, x2, y2 = line[0]
-                
-                # Calculate line angle to separate horizontal and vertical lines
-                angle = np.abs(np.degrees(np.arctan2(y2 - y1, x2 - x1)))
-                
-                # Classify as horizontal, vertical, or diagonal
-                if angle < 10 or angle > 170:  # Horizontal lines
-                    line_type = 'horizontal'
-                elif 80 < angle < 100:  # Vertical lines
-                    line_type = 'vertical'
-                else:
-                    line_type = 'diagonal'
-                
-                dimension_lines.append({
-                    'coords': (x1, y1, x2, y2),
-                    'type': line_type,
-                    'length': np.sqrt((x2 - x1) ** 2 + (y2 - y1) ** 2)
-                })
+        if lines is None:
+            return []
+        
+        # Classify all lines at once from their angles
+        lines = np.rint(lines.reshape(-1, 4)).astype(np.int32)
+        dx = (lines[:, 2] - lines[:, 0]).astype(np.float64)
+        dy = (lines[:, 3] - lines[:, 1]).astype(np.float64)
+        angles = np.abs(np.degrees(np.arctan2(dy, dx)))
+        lengths = np.hypot(dx, dy)
+        line_types = np.select(
+            [(angles < 10) | (angles > 170),   # Horizontal lines
+             (angles > 80) & (angles < 100)],  # Vertical lines
+            ['horizontal', 'vertical'],
+            default='diagonal'
+        )
         
-        return dimension_lines
+        return [
+            {'coords': tuple(coords), 'type': line_type, 'length': length}
+            for coords, line_type, length in zip(lines.tolist(), line_types.tolist(), lengths.tolist())
+        ]
     
-    def _display_view_with_dimensions(self, view_type, dimensions, dimension_lines):
+    def _display_view_with_dimensions(self, view_type, dimensions, dimension_lines, view_image=None):
         """Display view with highlighted dimensions."""
-        view_image = self.views[view_type]['image'].copy()
+        if not self.display:
+            return
+        
+        # Draw on a fresh copy
+        if view_image is None:
+            view_image = self._get_image(view_type)
+        else:
+            view_image = view_image.copy()
         
         # Draw dimension lines
         for line in dimension_lines:
@@ -277,17 +428,25 @@ class DimensionExtractor:
                 2
             )
         
-        # Display the image
-        plt.figure(figsize=(10, 8))
-        plt.imshow(cv2.cvtColor(view_image, cv2.COLOR_BGR2RGB))
-        plt.title(f"Dimensions for {view_type}")
-        plt.axis('off')
-        plt.show()
+        # Display the image as an encoded PNG (no matplotlib figure needed)
+        _, png = cv2.imencode('.png', view_image)
+        print(f"Dimensions for {view_type}")
+        display(DisplayImage(data=png.tobytes()))
     
     def extract_all_dimensions(self):
         """Extract dimensions from all views."""
-        for view_type in self.views:
-            self.extract_dimensions_from_view(view_type)
+        # Views are independent and mostly run in OpenCV/Tesseract code that
+        # releases the GIL, so process them concurrently
+        view_types = list(self.views)
+        if view_types:
+            list(_view_executor.map(lambda view_type: self.extract_dimensions_from_view(view_type, display=False),
+                                    view_types))
+        
+        # Notebook output has to come from the main thread
+        if self.display:
+            for view_type in view_types:
+                result = self.dimensions[view_type]
+                self._display_view_with_dimensions(view_type, result['extracted'], result['dimension_lines'])
         
         return self.dimensions
     
@@ -306,57 +465,24 @@ class DimensionExtractor:
             'depth': None
         }
         
-        # Extract standard dimensions from each view if available
-        top_dims = self.dimensions.get('TOP_VIEW', {}).get('extracted', {})
-        front_dims = self.dimensions.get('FRONT_VIEW', {}).get('extracted', {})
-        side_dims = self.dimensions.get('SIDE_VIEW', {}).get('extracted', {})
-        
-        # Match width (should be consistent in TOP and FRONT views)
-        if 'width' in top_dims and 'width' in front_dims:
-            # Check if they're close (within 5%)
-            top_width = top_dims['width']
-            front_width = front_dims['width']
-            
-            if self._are_values_close(top_width, front_width):
-                matched['width'] = (top_width + front_width) / 2  # Average them
-            else:
-                # If they differ significantly, prioritize one (e.g., top view)
-                matched['width'] = top_width
-                print(f"Warning: Width mismatch between TOP ({top_width}) and FRONT ({front_width}) views")
-        elif 'width' in top_dims:
-            matched['width'] = top_dims['width']
-        elif 'width' in front_dims:
-            matched['width'] = front_dims['width']
-        
-        # Match height (should be consistent in FRONT and SIDE views)
-        if 'height' in front_dims and 'height' in side_dims:
-            front_height = front_dims['height']
-            side_height = side_dims['height']
-            
-            if self._are_values_close(front_height, side_height):
-                matched['height'] = (front_height + side_height) / 2
-            else:
-                matched['height'] = front_height
-                print(f"Warning: Height mismatch between FRONT ({front_height}) and SIDE ({side_height}) views")
-        elif 'height' in front_dims:
-            matched['height'] = front_dims['height']
-        elif 'height' in side_dims:
-            matched['height'] = side_dims['height']
-        
-        # Match depth (should be consistent in TOP and SIDE views)
-        if 'depth' in top_dims and 'depth' in side_dims:
-            top_depth = top_dims['depth']
-            side_depth = side_dims['depth']
+        # Each dimension should be consistent between the two views that show
+        # it; if they differ significantly, prioritize the first view
+        for dim_name, (primary_view, secondary_view) in _DIMENSION_VIEWS.items():
+            primary = self.dimensions.get(primary_view, {}).get('extracted', {}).get(dim_name)
+            secondary = self.dimensions.get(secondary_view, {}).get('extracted', {}).get(dim_name)
             
-            if self._are_values_close(top_depth, side_depth):
-                matched['depth'] = (top_depth + side_depth) / 2
-            else:
-                matched['depth'] = top_depth
-                print(f"Warning: Depth mismatch between TOP ({top_depth}) and SIDE ({side_depth}) views")
-        elif 'depth' in top_dims:
-            matched['depth'] = top_dims['depth']
-        elif 'depth' in side_dims:
-            matched['depth'] = side_dims['depth']
+            if primary is not None and secondary is not None:
+                # Check if they're close (within 5%)
+                if self._are_values_close(primary, secondary):
+                    matched[dim_name] = (primary + secondary) / 2  # Average them
+                else:
+                    matched[dim_name] = primary
+                    print(f"Warning: {dim_name.capitalize()} mismatch between "
+                          f"{primary_view[:-5]} ({primary}) and {secondary_view[:-5]} ({secondary}) views")
+            elif primary is not None:
+                matched[dim_name] = primary
+            elif secondary is not None:
+                matched[dim_name] = secondary
         
         # Add any additional dimensions that might be important
         additional_dims = {}
@@ -425,8 +551,12 @@ class DimensionExtractor:
         """Export results to JSON file."""
         structure = self.create_operations_structure()
         
-        with open(filename, 'w') as f:
-            json.dump(structure, f, indent=2)
+        if orjson is not None:
+            with open(filename, 'wb') as f:
+                f.write(orjson.dumps(structure, option=orjson.OPT_INDENT_2))
+        else:
+            with open(filename, 'w') as f:
+                json.dump(structure, f, indent=2)
         print(f"Data exported to {filename}")
         
         # In Colab, also offer download
@@ -1,4 +1,4 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 import cv2
 import numpy as np
 import pytesseract
@@ -7,26 +7,146 @@ import re
 import json
 import tempfile
 import os
+import queue
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from werkzeug.utils import secure_filename
 from typing import Dict, List, Tuple, Any, Optional
 
+# orjson serializes responses several times faster than the json module
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# tesserocr keeps the Tesseract model loaded in-process; pytesseract starts a
+# new tesseract process (and reloads the language data) on every call
+try:
+    from tesserocr import PyTessBaseAPI, PSM, RIL, iterate_level
+    from PIL import Image
+except ImportError:
+    PyTessBaseAPI = None
+
 app = Flask(__name__)
 
 # Configure pytesseract path (adjust based on your system)
 # For Windows: pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
 # For Linux: pytesseract.pytesseract.tesseract_cmd = '/usr/bin/tesseract'
 
+# Common dimension formats (e.g., "100 mm", "100mm", "100")
+_DIMENSION_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*(?:mm|cm|m)?', re.IGNORECASE)
+
+# Views that show each overall dimension, the preferred one first
+_DIMENSION_VIEWS = {
+    'width': ('TOP_VIEW', 'FRONT_VIEW'),
+    'height': ('FRONT_VIEW', 'SIDE_VIEW'),
+    'depth': ('TOP_VIEW', 'SIDE_VIEW'),
+}
+
+# Longest side (px) of the image handed to Tesseract; text on larger scans is
+# already well above the size Tesseract needs
+MAX_OCR_DIMENSION = 1600
+
+# Blank band (px) between the images stacked for a single OCR pass
+OCR_STACK_GAP = 40
+
+# Idle tesserocr APIs, shared by all requests. An API is not thread-safe, so
+# each OCR call takes one out (creating it if none is free) and puts it back
+_tess_apis = queue.SimpleQueue()
+
+# Idle CLAHE objects, reused across views and requests in the same way
+_clahes = queue.SimpleQueue()
+
+@contextmanager
+def pooled_tess_api():
+    """Borrow an idle tesserocr API from the pool (creating one if none is free)."""
+    try:
+        api = _tess_apis.get_nowait()
+    except queue.Empty:
+        api = PyTessBaseAPI(psm=PSM.AUTO)
+    try:
+        yield api
+    finally:
+        _tess_apis.put(api)
+
+def image_to_string(image) -> str:
+    """OCR an image with a pooled tesserocr API if available, else pytesseract."""
+    if PyTessBaseAPI is None:
+        return pytesseract.image_to_string(image)
+    
+    with pooled_tess_api() as api:
+        api.SetImage(Image.fromarray(image))
+        return api.GetUTF8Text()
+
+def image_to_words(image) -> List[Tuple[str, float]]:
+    """OCR an image into (word, vertical center) pairs in reading order."""
+    if PyTessBaseAPI is None:
+        data = pytesseract.image_to_data(image, output_type=pytesseract.Output.DICT)
+        return [
+            (word, top + height / 2)
+            for word, top, height in zip(data['text'], data['top'], data['height'])
+            if word.strip()
+        ]
+    
+    with pooled_tess_api() as api:
+        api.SetImage(Image.fromarray(image))
+        api.Recognize()
+        iterator = api.GetIterator()
+        if iterator is None:
+            return []
+        
+        words = []
+        for result in iterate_level(iterator, RIL.WORD):
+            word = result.GetUTF8Text(RIL.WORD)
+            if word and word.strip():
+                _, top, _, bottom = result.BoundingBox(RIL.WORD)
+                words.append((word, (top + bottom) / 2))
+        return words
+
+def merge_ocr_values(passes: List[List[float]]) -> List[float]:
+    """
+    Merge the values read from several copies of the same image.
+    
+    Each value (rounded to 3 decimals) appears as often as the copy that read
+    it most often, so a number read in both copies counts once but equal
+    dimensions within a copy (e.g. "50 50" on a square face) are kept.
+    Values come out in the order they were first read.
+    """
+    counts = Counter()
+    for values in passes:
+        counts |= Counter(round(value, 3) for value in values)
+    
+    merged = []
+    emitted = Counter()
+    for values in passes:
+        for value in values:
+            key = round(value, 3)
+            if emitted[key] < counts[key]:
+                emitted[key] += 1
+                merged.append(value)
+    return merged
+
 class DimensionExtractor:
     """
     Extract dimensions from cropped engineering drawing views and
     establish relationships between dimensions across views.
     """
     
-    def __init__(self):
-        """Initialize the extractor."""
+    def __init__(self, detect_lines: bool = False):
+        """
+        Initialize the extractor.
+        
+        Args:
+            detect_lines: Also run Hough line detection on each view (the
+                result is stored but not used to build the structure)
+        """
+        self.detect_lines = detect_lines
         self.views = {}
         self.dimensions = {}
         self.matched_dimensions = {}
+        self._lock = threading.Lock()
         
     def upload_views(self, files: Dict[str, Any]):
         """Process uploaded view images from Flask request."""
@@ -45,7 +165,8 @@ class DimensionExtractor:
             # Read image file
             filename = secure_filename(file.filename)
             file_bytes = file.read()
-            image = cv2.imdecode(np.frombuffer(file_bytes, np.uint8), cv2.IMREAD_COLOR)
+            # Decode straight to grayscale; only the gray image is ever used
+            image = cv2.imdecode(np.frombuffer(file_bytes, np.uint8), cv2.IMREAD_GRAYSCALE)
             
             # Store view
             self.views[f'{view_type.upper()}_VIEW'] = {
@@ -56,18 +177,32 @@ class DimensionExtractor:
         return self.views
     
     def preprocess_image(self, image):
-        """Preprocess image for better text detection."""
-        # Convert to grayscale
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        
-        # Increase contrast
-        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
-        gray = clahe.apply(gray)
-        
-        # Apply binary threshold
-        _, binary = cv2.threshold(gray, 180, 255, cv2.THRESH_BINARY_INV)
-        
-        return gray, binary
+        """Preprocess a grayscale image for better text detection."""
+        # Increase contrast (with a pooled CLAHE object; they are not thread-safe)
+        try:
+            clahe = _clahes.get_nowait()
+        except queue.Empty:
+            clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
+        try:
+            gray = clahe.apply(image)
+        finally:
+            _clahes.put(clahe)
+        
+        return gray
+    
+    def _stack_for_ocr(self, *images):
+        """Stack grayscale images vertically on a white canvas, with a gap between them."""
+        width = max(image.shape[1] for image in images)
+        height = sum(image.shape[0] for image in images) + OCR_STACK_GAP * (len(images) - 1)
+        canvas = np.full((height, width), 255, dtype=np.uint8)
+        
+        y = 0
+        for image in images:
+            h, w = image.shape
+            canvas[y:y + h, :w] = image
+            y += h + OCR_STACK_GAP
+        
+        return canvas
     
     def extract_dimensions_from_view(self, view_type: str) -> Dict[str, float]:
         """
@@ -78,27 +213,33 @@ class DimensionExtractor:
             return {}
         
         view_image = self.views[view_type]['image']
-        gray, binary = self.preprocess_image(view_image)
+        gray = self.preprocess_image(view_image)
         
         # Extract text using OCR
         extracted_dimensions = {}
         
-        # First try on the normal image with low threshold
-        text_normal = pytesseract.image_to_string(gray)
-        dimensions_normal = self._parse_dimensions_from_text(text_normal)
-        
-        # Try also on the binary image
-        text_binary = pytesseract.image_to_string(binary)
-        dimensions_binary = self._parse_dimensions_from_text(text_binary)
-        
-        # Try with different preprocessing
-        # Resize for better OCR
-        resized = cv2.resize(gray, None, fx=2, fy=2, interpolation=cv2.INTER_CUBIC)
-        text_resized = pytesseract.image_to_string(resized)
-        dimensions_resized = self._parse_dimensions_from_text(text_resized)
-        
-        # Combine results from different methods
-        all_dimensions = {**dimensions_normal, **dimensions_binary, **dimensions_resized}
+        # Large scans are shrunk to MAX_OCR_DIMENSION; small ones are OCR'd
+        # together with a 2x upsample (pyrUp is much faster than a CUBIC
+        # resize), stacked on a white canvas, in one pass
+        longest_side = max(gray.shape)
+        if longest_side > MAX_OCR_DIMENSION:
+            scale = MAX_OCR_DIMENSION / longest_side
+            small = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            ordered = list(self._parse_dimensions_from_text(image_to_string(small)).values())
+        elif 2 * longest_side > MAX_OCR_DIMENSION:
+            ordered = list(self._parse_dimensions_from_text(image_to_string(gray)).values())
+        else:
+            # Split the words back into the two copies by position, so a
+            # number read in both copies counts once
+            split_y = gray.shape[0] + OCR_STACK_GAP / 2
+            copies = ([], [])
+            for word, y in image_to_words(self._stack_for_ocr(gray, cv2.pyrUp(gray))):
+                copies[y >= split_y].append(word)
+            ordered = merge_ocr_values([
+                list(self._parse_dimensions_from_text(' '.join(words)).values())
+                for words in copies
+            ])
+        all_dimensions = {f'dim_{i+1}': value for i, value in enumerate(ordered)}
         
         # If dimensions were found through OCR
         if all_dimensions:
@@ -140,13 +281,19 @@ class DimensionExtractor:
                     extracted_dimensions = all_dimensions
         
         # Find dimension lines to associate with values
-        dimension_lines = self._detect_dimension_lines(binary)
+        dimension_lines = []
+        if self.detect_lines:
+            # Binary threshold, picked per image with Otsu's method so scans
+            # with different exposure need no retuning; only lines use it
+            _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU)
+            dimension_lines = self._detect_dimension_lines(binary)
         
         # Store the results
-        self.dimensions[view_type] = {
-            'extracted': extracted_dimensions,
-            'dimension_lines': dimension_lines
-        }
+        with self._lock:
+            self.dimensions[view_type] = {
+                'extracted': extracted_dimensions,
+                'dimension_lines': dimension_lines
+            }
         
         return extracted_dimensions
     
@@ -154,22 +301,15 @@ class DimensionExtractor:
         """
         Parse dimension values from OCR text.
         """
-        # Pattern to match common dimension formats (e.g., "100 mm", "100mm", "100")
-        dimension_pattern = re.compile(r'(\d+(?:\.\d+)?)\s*(?:mm|cm|m)?', re.IGNORECASE)
-        matches = dimension_pattern.findall(text)
+        # Blank regions OCR to whitespace only
+        if not text or text.isspace():
+            return {}
         
-        # Convert to float and map to positions
-        dimensions = {}
-        for i, match in enumerate(matches):
-            if match:
-                try:
-                    value = float(match)
-                    # Use dimension index as key initially
-                    dimensions[f'dim_{i+1}'] = value
-                except ValueError:
-                    pass
-        
-        return dimensions
+        # Use dimension index as key initially; every match is a valid number
+        return {
+            f'dim_{i}': float(match.group(1))
+            for i, match in enumerate(_DIMENSION_PATTERN.finditer(text), start=1)
+        }
     
     def _detect_dimension_lines(self, binary_image):
         """
@@ -185,34 +325,34 @@ class DimensionExtractor:
             maxLineGap=10
         )
         
-        dimension_lines = []
-        if lines is not None:
-            for line in lines:
-                x1, y1, x2, y2 = line[0]
-                
-                # Calculate line angle to separate horizontal and vertical lines
-                angle = np.abs(np.degrees(np.arctan2(y2 - y1, x2 - x1)))
-                
-                # Classify as horizontal, vertical, or diagonal
-                if angle < 10 or angle > 170:  # Horizontal lines
-                    line_type = 'horizontal'
-                elif 80 < angle < 100:  # Vertical lines
-                    line_type = 'vertical'
-                else:
-                    line_type = 'diagonal'
-                
-                dimension_lines.append({
-                    'coords': (x1, y1, x2, y2),
-                    'type': line_type,
-                    'length': np.sqrt((x2 - x1) ** 2 + (y2 - y1) ** 2)
-                })
+        if lines is None:
+            return []
+        
+        # Classify all lines at once from their angles
+        lines = lines.reshape(-1, 4)
+        dx = (lines[:, 2] - lines[:, 0]).astype(np.float64)
+        dy = (lines[:, 3] - lines[:, 1]).astype(np.float64)
+        angles = np.abs(np.degrees(np.arctan2(dy, dx)))
+        lengths = np.hypot(dx, dy)
+        line_types = np.select(
+            [(angles < 10) | (angles > 170),   # Horizontal lines
+             (angles > 80) & (angles < 100)],  # Vertical lines
+            ['horizontal', 'vertical'],
+            default='diagonal'
+        )
         
-        return dimension_lines
+        return [
+            {'coords': tuple(coords), 'type': line_type, 'length': length}
+            for coords, line_type, length in zip(lines.tolist(), line_types.tolist(), lengths.tolist())
+        ]
     
     def extract_all_dimensions(self):
         """Extract dimensions from all views."""
-        for view_type in self.views:
-            self.extract_dimensions_from_view(view_type)
+        # Views are independent and mostly run in OpenCV/Tesseract code that
+        # releases the GIL, so process them concurrently
+        if self.views:
+            with ThreadPoolExecutor(max_workers=len(self.views)) as executor:
+                list(executor.map(self.extract_dimensions_from_view, list(self.views)))
         
         return self.dimensions
     
@@ -231,57 +371,24 @@ class DimensionExtractor:
             'depth': None
         }
         
-        # Extract standard dimensions from each view if available
-        top_dims = self.dimensions.get('TOP_VIEW', {}).get('extracted', {})
-        front_dims = self.dimensions.get('FRONT_VIEW', {}).get('extracted', {})
-        side_dims = self.dimensions.get('SIDE_VIEW', {}).get('extracted', {})
-        
-        # Match width (should be consistent in TOP and FRONT views)
-        if 'width' in top_dims and 'width' in front_dims:
-            # Check if they're close (within 5%)
-            top_width = top_dims['width']
-            front_width = front_dims['width']
-            
-            if self._are_values_close(top_width, front_width):
-                matched['width'] = (top_width + front_width) / 2  # Average them
-            else:
-                # If they differ significantly, prioritize one (e.g., top view)
-                matched['width'] = top_width
-                print(f"Warning: Width mismatch between TOP ({top_width}) and FRONT ({front_width}) views")
-        elif 'width' in top_dims:
-            matched['width'] = top_dims['width']
-        elif 'width' in front_dims:
-            matched['width'] = front_dims['width']
-        
-        # Match height (should be consistent in FRONT and SIDE views)
-        if 'height' in front_dims and 'height' in side_dims:
-            front_height = front_dims['height']
-            side_height = side_dims['height']
-            
-            if self._are_values_close(front_height, side_height):
-                matched['height'] = (front_height + side_height) / 2
-            else:
-                matched['height'] = front_height
-                print(f"Warning: Height mismatch between FRONT ({front_height}) and SIDE ({side_height}) views")
-        elif 'height' in front_dims:
-            matched['height'] = front_dims['height']
-        elif 'height' in side_dims:
-            matched['height'] = side_dims['height']
-        
-        # Match depth (should be consistent in TOP and SIDE views)
-        if 'depth' in top_dims and 'depth' in side_dims:
-            top_depth = top_dims['depth']
-            side_depth = side_dims['depth']
+        # Each dimension should be consistent between the two views that show
+        # it; if they differ significantly, prioritize the first view
+        for dim_name, (primary_view, secondary_view) in _DIMENSION_VIEWS.items():
+            primary = self.dimensions.get(primary_view, {}).get('extracted', {}).get(dim_name)
+            secondary = self.dimensions.get(secondary_view, {}).get('extracted', {}).get(dim_name)
             
-            if self._are_values_close(top_depth, side_depth):
-                matched['depth'] = (top_depth + side_depth) / 2
-            else:
-                matched['depth'] = top_depth
-                print(f"Warning: Depth mismatch between TOP ({top_depth}) and SIDE ({side_depth}) views")
-        elif 'depth' in top_dims:
-            matched['depth'] = top_dims['depth']
-        elif 'depth' in side_dims:
-            matched['depth'] = side_dims['depth']
+            if primary is not None and secondary is not None:
+                # Check if they're close (within 5%)
+                if self._are_values_close(primary, secondary):
+                    matched[dim_name] = (primary + secondary) / 2  # Average them
+                else:
+                    matched[dim_name] = primary
+                    print(f"Warning: {dim_name.capitalize()} mismatch between "
+                          f"{primary_view[:-5]} ({primary}) and {secondary_view[:-5]} ({secondary}) views")
+            elif primary is not None:
+                matched[dim_name] = primary
+            elif secondary is not None:
+                matched[dim_name] = secondary
         
         # Add any additional dimensions that might be important
         additional_dims = {}
@@ -310,18 +417,10 @@ class DimensionExtractor:
         Create a structure with the exact format requested.
         """
         # Use matched dimensions if available, otherwise use default values
-        width = 100.0
-        height = 100.0
-        depth = 100.0
-        
-        if self.matched_dimensions:
-            # Only use matched dimensions if they exist, otherwise keep defaults
-            if self.matched_dimensions.get('width') is not None:
-                width = self.matched_dimensions['width']
-            if self.matched_dimensions.get('height') is not None:
-                height = self.matched_dimensions['height']
-            if self.matched_dimensions.get('depth') is not None:
-                depth = self.matched_dimensions['depth']
+        dimensions = {}
+        for dim_name in ('width', 'height', 'depth'):
+            value = self.matched_dimensions.get(dim_name)
+            dimensions[dim_name] = 100.0 if value is None else float(value)
         
         # Create the exact structure requested
         structure = {
@@ -330,11 +429,7 @@ class DimensionExtractor:
                 "operations": [
                     {
                         "type": "extrude",
-                        "dimensions": {
-                            "width": float(width),
-                            "height": float(height),
-                            "depth": float(depth)
-                        },
+                        "dimensions": dimensions,
                         "position": {"x": 0, "y": 0, "z": 0}
                     }
                 ]
@@ -343,6 +438,12 @@ class DimensionExtractor:
         
         return structure
 
+def json_response(payload, status=200):
+    """JSON response serialized with orjson when available, else jsonify."""
+    if orjson is None:
+        return jsonify(payload), status
+    return Response(orjson.dumps(payload), status=status, mimetype='application/json')
+
 @app.route('/extract-dimensions', methods=['POST'])
 @cross_origin()
 def extract_dimensions():
@@ -352,13 +453,15 @@ def extract_dimensions():
     - top_view: Image file for top view
     - front_view: Image file for front view
     - side_view: Image file for side view
+    Query parameters:
+    - lines=1: also run dimension line detection
     """
     if 'top_view' not in request.files or 'front_view' not in request.files or 'side_view' not in request.files:
-        return jsonify({"error": "Missing one or more required view images (top_view, front_view, side_view)"}), 400
+        return json_response({"error": "Missing one or more required view images (top_view, front_view, side_view)"}, 400)
     
     try:
         # Initialize the extractor
-        extractor = DimensionExtractor()
+        extractor = DimensionExtractor(detect_lines=request.args.get('lines') == '1')
         
         # Process uploaded files
         extractor.upload_views(request.files)
@@ -372,13 +475,18 @@ def extract_dimensions():
         # Create the operations structure
         result = extractor.create_operations_structure()
         
-        return jsonify(result)
+        return json_response(result)
     
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return json_response({"error": str(e)}, 500)
     
 
 
 
+# For deployment on Linux, serve the app with several worker processes instead
+# of the development server, e.g.:
+#   gunicorn -w $(nproc) -k gthread --threads 2 -b 0.0.0.0:5001 opencv_server:app
+# Each worker builds its own tesserocr/CLAHE pools on first use.
 if __name__ == '__main__':
-    app.run(debug=True, port=5001)
\ No newline at end of file
+    # The debugger and reloader slow every request; opt in with FLASK_DEBUG=1
+    app.run(debug=os.environ.get('FLASK_DEBUG') == '1', port=5001, threaded=True)
\ No newline at end of file
@@ -156,123 +156,6 @@ os.makedirs(TEMP_DIR, exist_ok=True)
 #     except Exception as e:
 #         return jsonify({"status": "error", "message": str(e)}), 500
     
-def generate_vba_from_json(data):
-    """
-    Generates SolidWorks VBA script from JSON input
-    Args:
-        data (dict): Parsed JSON data containing shape definitions
-    Returns:
-        str: Generated VBA script
-    """
-    vba_script = """Option Explicit
-
-Sub CreateShape()
-    Dim swApp As SldWorks.SldWorks
-    Dim swModel As SldWorks.ModelDoc2
-    Dim swSketchMgr As SldWorks.SketchManager
-    
-    ' Connect to SolidWorks
-    On Error Resume Next
-    Set swApp = Application.SldWorks
-    On Error GoTo 0
-    If swApp Is Nothing Then
-        MsgBox "SolidWorks is not running", vbExclamation, "Error"
-        Exit Sub
-    End If
-    
-    ' Create new part
-    Set swModel = swApp.NewPart()
-    If swModel Is Nothing Then
-        MsgBox "Failed to create new part", vbExclamation, "Error"
-        Exit Sub
-    End If
-    
-    ' Set units to millimeters (converted to meters in API calls)
-    swModel.SetUnits 0, 0, 6, False  ' swMM = 0, swUnitsDecimal = 0
-    
-    ' Initialize sketch manager
-    Set swSketchMgr = swModel.SketchManager
-"""
-    
-    operations = data.get("root", {}).get("operations", [])
-    
-    for op in operations:
-        op_type = op.get("type", "").lower()
-        
-        if op_type == "extrude":
-            dims = op.get("dimensions", {})
-            width = dims.get("width", 100.0) / 1000  # mm to m
-            height = dims.get("height", 100.0) / 1000
-            depth = dims.get("depth", 100.0) / 1000
-            pos = op.get("position", {"x": 0, "y": 0, "z": 0})
-            
-            vba_script += f"""
-    ' Create extrusion sketch
-    swModel.ClearSelection2 True
-    swModel.SketchManager.InsertSketch True
-    
-    ' Draw center rectangle (Width: {width*1000}mm, Height: {height*1000}mm)
-    swSketchMgr.CreateCenterRectangle {pos.get('x', 0)/1000}, {pos.get('y', 0)/1000}, 0, {width/2}, {height/2}, 0
-    
-    ' Exit sketch
-    swModel.InsertSketch2 True
-    
-    ' Extrude to {depth*1000}mm depth
-    swModel.FeatureManager.FeatureExtrusion2 _
-        True, False, False, 0, 0, {depth}, 0.01, _
-        False, False, False, False, 0, 0, _
-        False, False, False, False, True, True, True, _
-        0, 0, False
-"""
-        
-        elif op_type == "sketch":
-            contour = op.get("contour", [])
-            extrude_depth = op.get("extrude", {}).get("depth", 0) / 1000
-            
-            vba_script += """
-    ' Create sketch
-    swModel.ClearSelection2 True
-    swModel.SketchManager.InsertSketch True
-"""
-            
-            for segment in contour:
-                seg_type = segment.get("type", "").lower()
-                start = segment.get("start", {"x": 0, "y": 0})
-                end = segment.get("end", {"x": 0, "y": 0})
-                
-                if seg_type == "line":
-                    vba_script += f"""
-    ' Draw line from ({start.get('x', 0)}mm,{start.get('y', 0)}mm) to ({end.get('x', 0)}mm,{end.get('y', 0)}mm)
-    swSketchMgr.CreateLine {start.get('x', 0)/1000}, {start.get('y', 0)/1000}, 0, {end.get('x', 0)/1000}, {end.get('y', 0)/1000}, 0
-"""
-            
-            if extrude_depth > 0:
-                vba_script += f"""
-    ' Exit sketch
-    swModel.InsertSketch2 True
-    
-    ' Extrude sketch to {extrude_depth*1000}mm
-    swModel.FeatureManager.FeatureExtrusion2 _
-        True, False, False, 0, 0, {extrude_depth}, 0.01, _
-        False, False, False, False, 0, 0, _
-        False, False, False, False, True, True, True, _
-        0, 0, False
-"""
-    
-    vba_script += """
-    ' Zoom to fit
-    swModel.ViewZoomtofit2
-    
-    ' Clean up
-    Set swSketchMgr = Nothing
-    Set swModel = Nothing
-    Set swApp = Nothing
-    
-    MsgBox "Shape created successfully!", vbInformation, "Done"
-End Sub
-"""
-    return vba_script
-
 @app.route('/generate-vba', methods=['POST'])
 def generate_vba():
     """
@@ -283,7 +166,7 @@ def generate_vba():
         if not data:
             return jsonify({"error": "No JSON data provided"}), 400
         
-        vba_script = generate_vba_from_json(data)
+        vba_script = generate_vba_from_json(data, 'all')
         return jsonify({
             "status": "success",
             "vba_script": vba_script
@@ -0,0 +1,44 @@
+"""
+Checks for the OCR helpers in opencv_server.py
+
+Run with pytest; skipped unless OpenCV, Flask and tesserocr (with Tesseract's
+English data) are installed.
+"""
+
+import os
+import sys
+import pytest
+
+cv2 = pytest.importorskip('cv2')
+np = pytest.importorskip('numpy')
+pytest.importorskip('flask')
+pytest.importorskip('flask_cors')
+pytest.importorskip('pytesseract')
+pytest.importorskip('tesserocr')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import opencv_server
+
+
+def test_image_to_words_uses_tesserocr():
+    """Words come back as text with the vertical center of their box"""
+    assert opencv_server.PyTessBaseAPI is not None
+
+    # putText places the text baseline at the given y
+    image = np.full((240, 480), 255, dtype=np.uint8)
+    cv2.putText(image, '120 mm', (20, 70), cv2.FONT_HERSHEY_SIMPLEX, 1.5, 0, 3)
+    cv2.putText(image, '45', (20, 190), cv2.FONT_HERSHEY_SIMPLEX, 1.5, 0, 3)
+
+    words = opencv_server.image_to_words(image)
+    centers = dict(words)
+
+    assert all(isinstance(word, str) and word.strip() for word, _ in words)
+    assert '120' in centers and '45' in centers
+    assert 30 < centers['120'] < 70
+    assert 150 < centers['45'] < 190
+
+
+def test_image_to_words_blank_image():
+    """A blank image reads as no words rather than an error"""
+    image = np.full((100, 100), 255, dtype=np.uint8)
+    assert opencv_server.image_to_words(image) == []